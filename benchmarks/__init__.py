@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for the ICICI Insurance Chatbot
+Run from the project root, e.g. python -m benchmarks.bench_vector_index
+"""
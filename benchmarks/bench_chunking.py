@@ -0,0 +1,103 @@
+"""
+Encode time, truncation and retrieval hit-rate: 500-word windows vs the sentence chunker
+
+A query is a sentence sampled from the corpus; it is a hit when one of the top-k
+retrieved chunks contains that sentence. Sentences that fall past the model's
+token limit in a long chunk are never embedded, which is what the hit-rate exposes.
+
+Usage: python -m benchmarks.bench_chunking --pdf policy_wording.pdf --queries 300
+       python -m benchmarks.bench_chunking            # synthetic policy text
+"""
+import argparse
+import random
+import time
+from sentence_transformers import SentenceTransformer
+from chunker import SentenceChunker, split_sentences, tokenizer_token_counts, SPECIAL_TOKENS
+from pdf_processor import PDFProcessor
+from vector_index import ExactIndex
+
+PRODUCTS = ["iProtect Smart", "Signature", "Guaranteed Pension", "Smart Kid", "Lakshya", "Cash Advantage",
+            "Future Perfect", "Elite Wealth", "Heart Protect", "Saral Jeevan"]
+FEATURES = ["death benefit", "maturity benefit", "surrender value", "grace period", "free look period",
+            "loyalty addition", "premium waiver", "critical illness cover", "loan facility", "annuity payout"]
+
+
+def legacy_chunks(text: str, chunk_size: int = 500, overlap: int = 50):
+    """The original word-window chunker"""
+    words = text.split()
+    return [' '.join(words[i:i + chunk_size]) for i in range(0, len(words), chunk_size - overlap)]
+
+
+def synthetic_pages(n_pages: int, seed: int = 0):
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(n_pages):
+        sentences = []
+        for _ in range(rng.randint(20, 40)):
+            product, feature = rng.choice(PRODUCTS), rng.choice(FEATURES)
+            sentences.append(
+                f"Under {product} the {feature} is {rng.randint(2, 120)} percent of the sum assured "
+                f"when the policy has run for {rng.randint(1, 30)} years and premiums are paid "
+                f"{rng.choice(['monthly', 'annually', 'as a single premium'])}."
+            )
+        pages.append(' '.join(sentences))
+    return pages
+
+
+def evaluate(name, chunks, model, count_tokens, limit, queries, top_k):
+    token_counts = count_tokens(chunks)
+    truncated = [count - limit for count in token_counts if count > limit]
+
+    start = time.perf_counter()
+    embeddings = model.encode(chunks, batch_size=32)
+    encode_s = time.perf_counter() - start
+
+    index = ExactIndex()
+    index.build(embeddings)
+    query_embeddings = model.encode(queries, batch_size=32)
+    hits = 0
+    for query, embedding in zip(queries, query_embeddings):
+        top_indices, _ = index.search(embedding, top_k=top_k)
+        hits += any(query in chunks[i] for i in top_indices)
+
+    print(f"{name:>10}{len(chunks):>8}{sum(token_counts) / len(chunks):>12.0f}"
+          f"{len(truncated):>11}{100 * sum(truncated) / sum(token_counts):>15.1f}"
+          f"{encode_s:>10.2f}{hits / len(queries):>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark word-window vs sentence-aware chunking")
+    parser.add_argument("--pdf", help="PDF to chunk (default: synthetic policy text)")
+    parser.add_argument("--pages", type=int, default=40, help="synthetic pages when no PDF is given")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.pdf:
+        processor = PDFProcessor(args.pdf)
+        pages = [processor.clean_text(text) for _, text in processor.iter_pages()]
+    else:
+        pages = synthetic_pages(args.pages)
+
+    model = SentenceTransformer(args.model)
+    count_tokens = tokenizer_token_counts(model.tokenizer)
+    limit = model.max_seq_length - SPECIAL_TOKENS
+
+    rng = random.Random(1)
+    candidates = [s for page in pages for s in split_sentences(page) if len(s.split()) >= 8]
+    queries = rng.sample(candidates, min(args.queries, len(candidates)))
+
+    chunker = SentenceChunker(max_tokens=limit, count_tokens=count_tokens)
+    sentence_chunks = [chunk for _, chunk in chunker.iter_chunks(pages)]
+
+    print(f"{len(pages)} pages, {len(queries)} queries, token limit {limit}, top_k={args.top_k}")
+    print(f"{'chunker':>10}{'chunks':>8}{'mean tokens':>12}{'truncated':>11}{'tokens lost %':>15}"
+          f"{'encode s':>10}{'hit-rate':>12}")
+    evaluate("words", legacy_chunks(' '.join(pages)), model, count_tokens, limit, queries, args.top_k)
+    evaluate("sentence", sentence_chunks, model, count_tokens, limit, queries, args.top_k)
+    print(f"sentence chunker stats: {chunker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+ConversationDB throughput under concurrent sessions: the previous
+connect-per-call pattern versus pooled per-thread WAL connections, with and
+without the write-behind queue (caller-side write latency)
+
+Usage: python -m benchmarks.bench_conversation_db --threads 8 --turns 200
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from database import ConversationDB, utc_timestamp, INSERT_CONVERSATION_SQL, UPDATE_ACTIVITY_SQL, INSERT_SESSION_SQL, SELECT_HISTORY_SQL
+
+
+class ConnectPerCallDB(ConversationDB):
+    """The original access pattern: a fresh sqlite3 connection for every call"""
+
+    def _connection(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def create_session(self, session_id):
+        conn = self._connection()
+        now = datetime.now()
+        conn.execute(INSERT_SESSION_SQL, (session_id, now, now))
+        conn.commit()
+        conn.close()
+
+    def add_conversation(self, session_id, user_message, bot_response, context_chunks=None):
+        conn = self._connection()
+        conn.execute(INSERT_CONVERSATION_SQL, (session_id, user_message, bot_response, utc_timestamp(), None))
+        conn.execute(UPDATE_ACTIVITY_SQL, (datetime.now(), session_id))
+        conn.commit()
+        conn.close()
+
+    def get_conversation_history(self, session_id, limit=10):
+        conn = self._connection()
+        rows = conn.execute(SELECT_HISTORY_SQL, (session_id, limit)).fetchall()
+        conn.close()
+        return rows
+
+    def close(self):
+        pass
+
+
+def run(db, threads: int, turns: int):
+    """Each thread plays one session: create, then write and read history per turn"""
+    write_times, read_times = [], []
+
+    def session(worker_id):
+        session_id = f"bench-{worker_id}"
+        db.create_session(session_id)
+        for turn in range(turns):
+            start = time.perf_counter()
+            db.add_conversation(session_id, f"question {turn}", "answer " * 40, ["chunk"])
+            write_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            db.get_conversation_history(session_id, limit=3)
+            read_times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(session, range(threads)))
+    elapsed = time.perf_counter() - start
+
+    reads = np.array(read_times) * 1000
+    return len(write_times) / elapsed, np.percentile(reads, 50), np.percentile(reads, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ConversationDB connection handling")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.threads} concurrent sessions x {args.turns} turns")
+    print(f"{'mode':<20}{'writes/s':>12}{'read p50 ms':>14}{'read p99 ms':>14}")
+    modes = [
+        ("connect-per-call", ConnectPerCallDB, False),
+        ("pooled WAL", ConversationDB, False),
+        ("write-behind", ConversationDB, True),
+    ]
+    for label, db_class, write_behind in modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = db_class(os.path.join(tmp, "bench.db"))
+            if write_behind:
+                db.start_write_behind()
+            writes, p50, p99 = run(db, args.threads, args.turns)
+            db.close()
+        print(f"{label:<20}{writes:>12.1f}{p50:>14.3f}{p99:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
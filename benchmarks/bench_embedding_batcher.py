@@ -0,0 +1,86 @@
+"""
+Load test for query embedding micro-batching: throughput vs p99 latency for
+unbatched encoding and several batching windows
+
+Usage: python -m benchmarks.bench_embedding_batcher --clients 32 --requests 2000
+       python -m benchmarks.bench_embedding_batcher --synthetic   (no model download)
+"""
+import argparse
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from embedding_batcher import EmbeddingBatcher
+
+QUERIES = [
+    "what is term insurance",
+    "how do I file a death claim",
+    "tax benefits under section 80C",
+    "what riders are available",
+    "how to pay my premium online",
+    "maturity benefit of savings plans",
+]
+
+
+def synthetic_encoder(dim: int = 384, fixed_ms: float = 8.0, per_item_ms: float = 0.5):
+    """Stand-in encoder with a fixed per-call cost, like a transformer forward pass"""
+    lock = threading.Lock()
+
+    def encode(texts):
+        with lock:
+            time.sleep((fixed_ms + per_item_ms * len(texts)) / 1000.0)
+        return np.random.default_rng(len(texts)).standard_normal((len(texts), dim)).astype(np.float32)
+
+    return encode
+
+
+def run_load(encode_one, clients: int, requests: int):
+    """Fire requests from a pool of client threads; return (throughput, p50, p99)"""
+    latencies = []
+
+    def call(i):
+        start = time.perf_counter()
+        encode_one(QUERIES[i % len(QUERIES)])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies)
+    return requests / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query embedding micro-batching")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--windows-ms", type=float, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--synthetic", action="store_true", help="use a simulated encoder")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        encode_fn = synthetic_encoder()
+    else:
+        from sentence_transformers import SentenceTransformer
+        encode_fn = SentenceTransformer(args.model).encode
+
+    print(f"{args.clients} clients, {args.requests} requests")
+    print(f"{'mode':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'batch':>8}")
+
+    throughput, p50, p99 = run_load(lambda q: encode_fn([q])[0], args.clients, args.requests)
+    print(f"{'unbatched':<22}{throughput:>10.1f}{p50:>10.2f}{p99:>10.2f}{1.0:>8.1f}")
+
+    for window in args.windows_ms:
+        batcher = EmbeddingBatcher(encode_fn, max_batch_size=args.max_batch_size, max_wait_ms=window)
+        throughput, p50, p99 = run_load(batcher.encode, args.clients, args.requests)
+        batcher.close()
+        label = f"batched {window:g} ms"
+        print(f"{label:<22}{throughput:>10.1f}{p50:>10.2f}{p99:>10.2f}{batcher.mean_batch_size:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
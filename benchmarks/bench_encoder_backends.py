@@ -0,0 +1,95 @@
+"""
+Equivalence, latency and startup of the torch and ONNX encoder backends
+
+Embeds the FAQ answers and questions with each backend. Cosine agreement with the
+torch embeddings and recall@k of question -> answer-sentence retrieval are reported
+against torch. The script exits non-zero if an ONNX variant falls below its --min-cosine,
+so it doubles as the equivalence check after re-exporting a model.
+
+Usage: python -m encoders export --output models/all-MiniLM-L6-v2-onnx --quantize
+       python -m benchmarks.bench_encoder_backends --onnx-dir models/all-MiniLM-L6-v2-onnx
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+import numpy as np
+from benchmarks.common import time_calls, recall_at_k
+from chunker import split_sentences
+from encoders import load_encoder
+from faq import FAQ_DATABASE, FAQ_MATCHER
+from vector_index import ExactIndex
+
+# (label, backend, quantized)
+VARIANTS = [("torch", "torch", False), ("onnx", "onnx", False), ("onnx int8", "onnx", True)]
+
+
+def measure_startup(model_name: str, backend: str, onnx_dir: str, quantized: bool, results):
+    """Import, load and first encode, measured in a fresh process"""
+    start = time.perf_counter()
+    encoder = load_encoder(model_name, backend, onnx_dir=onnx_dir, quantized=quantized)
+    encoder.encode(["warm up"])
+    results[(backend, quantized)] = time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and check encoder backends")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--onnx-dir", default="")
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--min-cosine", type=float, default=0.99,
+                        help="lowest acceptable per-sentence cosine against torch (fp32 ONNX)")
+    parser.add_argument("--min-cosine-int8", type=float, default=0.95,
+                        help="the same for the dynamically quantized int8 model")
+    args = parser.parse_args()
+
+    corpus = [s for faq in FAQ_DATABASE.values() for s in split_sentences(faq["answer"])]
+    queries = FAQ_MATCHER.questions
+
+    with multiprocessing.Manager() as manager:
+        startup = manager.dict()
+        for _, backend, quantized in VARIANTS:
+            process = multiprocessing.Process(target=measure_startup,
+                                              args=(args.model, backend, args.onnx_dir, quantized, startup))
+            process.start()
+            process.join()
+        startup = dict(startup)
+
+    reference = None
+    failed = False
+    print(f"{len(corpus)} corpus sentences, {len(queries)} queries, top_k={args.top_k}")
+    print(f"{'backend':<12}{'startup s':>10}{'min cos':>9}{'mean cos':>9}{'recall@k':>10}"
+          f"{'query ms':>10}{'p99 ms':>8}{'batch/s':>9}")
+    for label, backend, quantized in VARIANTS:
+        encoder = load_encoder(args.model, backend, onnx_dir=args.onnx_dir, quantized=quantized)
+        corpus_embeddings = np.asarray(encoder.encode(corpus), dtype=np.float32)
+        query_embeddings = np.asarray(encoder.encode(queries), dtype=np.float32)
+
+        index = ExactIndex()
+        index.build(corpus_embeddings)
+        results = [index.search(q, args.top_k)[0] for q in query_embeddings]
+        if reference is None:
+            reference = (index.vectors, results)
+
+        agreement = np.sum(index.vectors * reference[0], axis=1)
+        recall = recall_at_k(results, reference[1], args.top_k)
+        latency = time_calls(lambda q: encoder.encode([q]), queries)
+        start = time.perf_counter()
+        encoder.encode(corpus, batch_size=32)
+        per_second = len(corpus) / (time.perf_counter() - start)
+
+        print(f"{label:<12}{startup.get((backend, quantized), float('nan')):>10.2f}"
+              f"{agreement.min():>9.4f}{agreement.mean():>9.4f}{recall:>10.3f}"
+              f"{latency['mean_ms']:>10.2f}{latency['p99_ms']:>8.2f}{per_second:>9.0f}")
+        threshold = args.min_cosine_int8 if quantized else args.min_cosine
+        if agreement.min() < threshold:
+            print(f"FAIL: {label} fell below cosine {threshold} against torch")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+    print(f"OK: cosine agreement with torch >= {args.min_cosine} (fp32) and {args.min_cosine_int8} (int8)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Lookup latency of the compiled FAQ matcher against the original scan, and a replay
+check that both return the same FAQ for every sample query
+
+Sample queries are the FAQ key phrases, their paraphrased questions and a set of
+hand-written questions. The script exits non-zero if any answer differs, apart from
+the listed intended changes of whole-word keyword matching.
+
+Usage: python -m benchmarks.bench_faq_matcher
+"""
+import sys
+from benchmarks.common import time_calls
+from faq import FAQ_DATABASE, FAQ_MATCHER, find_faq_answer
+
+EXTRA_QUERIES = [
+    "What is the claim settlement ratio?", "Tell me about ICICI Insurance", "How do I file a claim?",
+    "What types of insurance do you offer?", "How can I contact customer support?",
+    "What is a rider?", "What riders can I add?", "How do I pay my premium?", "Can I pay premiums online?",
+    "How much does term insurance cost?", "What tax benefits do I get under 80C?",
+    "Is there a plan for my kids' education?", "What is a ULIP?", "Tell me about pension plans",
+    "What happens when the policy matures?", "What is the helpline number?", "Do you cover medical costs?",
+    "How do I determine my cover amount?", "Hello",
+]
+# Queries whose answer changes on purpose with whole-word keyword matching
+INTENDED_CHANGES = {
+    "What is the payment frequency?": "keyword 'pay' no longer matches inside 'payment'",
+}
+
+
+def legacy_find_faq_answer(query: str):
+    """The original linear scan with substring matching"""
+    query_lower = query.lower()
+    for faq_key, faq_data in FAQ_DATABASE.items():
+        if faq_key in query_lower and all(word in query_lower for word in faq_key.split()):
+            return faq_data["answer"]
+
+    max_matches = 0
+    best_match = None
+    for faq_key, faq_data in FAQ_DATABASE.items():
+        matches = sum(1 for keyword in faq_data["keywords"] if keyword in query_lower)
+        if matches >= 2:
+            key_words_in_query = sum(1 for word in faq_key.split() if word in query_lower)
+            total_score = matches + (key_words_in_query * 2)
+            if total_score > max_matches:
+                max_matches = total_score
+                best_match = faq_data["answer"]
+    return best_match if max_matches >= 4 else None
+
+
+def main():
+    queries = list(FAQ_MATCHER.questions) + EXTRA_QUERIES
+    faq_keys = {faq["answer"]: key for key, faq in FAQ_DATABASE.items()}
+
+    for query, reason in INTENDED_CHANGES.items():
+        if legacy_find_faq_answer(query) == find_faq_answer(query):
+            print(f"Intended change no longer observed for {query!r} ({reason})")
+
+    mismatches = 0
+    for query in queries:
+        expected, actual = legacy_find_faq_answer(query), find_faq_answer(query)
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH {query!r}: {faq_keys.get(expected)} -> {faq_keys.get(actual)}")
+
+    print(f"{len(queries)} queries, {mismatches} mismatches")
+    print(f"{'matcher':<10}{'mean us':>10}{'p99 us':>10}")
+    for name, fn in (("linear", legacy_find_faq_answer), ("compiled", find_faq_answer)):
+        stats = time_calls(fn, queries * 50)
+        print(f"{name:<10}{stats['mean_ms'] * 1000:>10.1f}{stats['p99_ms'] * 1000:>10.1f}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+History lookup latency as the conversations table grows, with and without
+the (session_id, timestamp) index added by schema migration 2
+
+Usage: python -m benchmarks.bench_history_lookup --rows 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+from benchmarks.common import time_calls
+from database import ConversationDB
+
+HISTORY_INDEXES = [
+    ('idx_conversations_session_timestamp',
+     'CREATE INDEX idx_conversations_session_timestamp ON conversations (session_id, timestamp)'),
+    ('idx_sessions_last_activity',
+     'CREATE INDEX idx_sessions_last_activity ON sessions (last_activity)'),
+]
+
+
+def populate(db: ConversationDB, rows: int, turns_per_session: int):
+    """Bulk-insert synthetic sessions with turns_per_session turns each"""
+    conn = db._connection()
+    sessions = max(1, rows // turns_per_session)
+    with conn:
+        conn.executemany(
+            'INSERT INTO sessions (session_id, created_at, last_activity) VALUES (?, ?, ?)',
+            ((f"s{i}", "2025-01-01 00:00:00", "2025-01-01 00:00:00") for i in range(sessions))
+        )
+        conn.executemany(
+            'INSERT INTO conversations (session_id, user_message, bot_response, timestamp) VALUES (?, ?, ?, ?)',
+            ((f"s{i % sessions}", "question", "answer " * 20, f"2025-01-01 00:{(i // sessions) % 60:02d}:00")
+             for i in range(rows))
+        )
+    return sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark conversation history lookups")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--turns-per-session", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'no index ms':>14}{'indexed ms':>14}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = ConversationDB(os.path.join(tmp, "bench.db"))
+            conn = db._connection()
+            for name, _ in HISTORY_INDEXES:
+                conn.execute(f'DROP INDEX IF EXISTS {name}')
+
+            sessions = populate(db, rows, args.turns_per_session)
+            targets = [f"s{random.randrange(sessions)}" for _ in range(args.lookups)]
+
+            unindexed = time_calls(lambda sid: db.get_conversation_history(sid, limit=10), targets)
+
+            for _, statement in HISTORY_INDEXES:
+                conn.execute(statement)
+            conn.execute('ANALYZE')
+            indexed = time_calls(lambda sid: db.get_conversation_history(sid, limit=10), targets)
+
+            db.close()
+        print(f"{rows:>10}{unindexed['mean_ms']:>14.3f}{indexed['mean_ms']:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+HTML extraction throughput and peak memory: BeautifulSoup reference path
+versus the streaming lxml extractor, on a directory of saved HTML pages
+
+Each backend runs in its own process so peak RSS is measured independently.
+
+Usage: python -m benchmarks.bench_html_extraction --corpus saved_pages/ --repeat 5
+       python -m benchmarks.bench_html_extraction            (synthetic pages)
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import time
+from benchmarks.http_fixture import synthetic_page
+from web_scraper import ICICIWebScraper
+
+
+def load_corpus(corpus_dir: str, synthetic_pages: int):
+    if corpus_dir:
+        paths = sorted(glob.glob(os.path.join(corpus_dir, "**", "*.htm*"), recursive=True))
+        pages = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        return pages
+    return [synthetic_page(f"/page-{i}.html", paragraphs=200) for i in range(synthetic_pages)]
+
+
+def run_backend(extractor: str, pages, repeat: int, results):
+    scraper = ICICIWebScraper(base_url="https://www.iciciprulife.com", extractor=extractor)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    outputs = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [scraper.parse_page("https://www.iciciprulife.com/page.html", html) for html in pages]
+    elapsed = time.perf_counter() - start
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results[extractor] = {
+        "pages_per_second": len(pages) * repeat / elapsed,
+        "peak_rss_delta_kb": rss_after - rss_before,
+        "texts": [page['content'] for page in outputs],
+    }
+
+
+def token_agreement(a: str, b: str) -> float:
+    """Jaccard similarity of the word sets of two extractions"""
+    wa, wb = set(a.split()), set(b.split())
+    return len(wa & wb) / len(wa | wb) if wa | wb else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction backends")
+    parser.add_argument("--corpus", help="directory of saved .html files")
+    parser.add_argument("--synthetic-pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus, args.synthetic_pages)
+    total_mb = sum(len(page) for page in pages) / 1e6
+    print(f"{len(pages)} pages ({total_mb:.1f} MB), {args.repeat} passes")
+
+    with multiprocessing.Manager() as manager:
+        results = manager.dict()
+        for extractor in ("bs4", "lxml"):
+            process = multiprocessing.Process(target=run_backend, args=(extractor, pages, args.repeat, results))
+            process.start()
+            process.join()
+        results = dict(results)
+
+    print(f"{'backend':<10}{'pages/s':>12}{'peak RSS +MB':>15}")
+    for extractor in ("bs4", "lxml"):
+        r = results[extractor]
+        print(f"{extractor:<10}{r['pages_per_second']:>12.1f}{r['peak_rss_delta_kb'] / 1024:>15.1f}")
+
+    agreement = [token_agreement(a, b) for a, b in zip(results["bs4"]["texts"], results["lxml"]["texts"])]
+    print(f"mean token agreement lxml vs bs4: {sum(agreement) / max(1, len(agreement)):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+PDF processing time and peak memory for serial and process-pool page extraction
+
+Usage: python -m benchmarks.bench_pdf_processing policy_wording.pdf --workers 1 4 8
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+from pdf_processor import PDFProcessor
+
+
+def run(pdf_path: str, workers: int, max_chunks: int, results):
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    chunks = PDFProcessor(pdf_path, max_chunks=max_chunks, workers=workers).process_pdf()
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results[workers] = (elapsed, len(chunks), (rss_after - rss_before) / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction and chunking")
+    parser.add_argument("pdf_path")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--max-chunks", type=int, default=100000)
+    args = parser.parse_args()
+
+    with multiprocessing.Manager() as manager:
+        results = manager.dict()
+        for workers in args.workers:
+            # Fresh process per run so peak RSS is not shared between runs
+            process = multiprocessing.Process(target=run, args=(args.pdf_path, workers, args.max_chunks, results))
+            process.start()
+            process.join()
+        results = dict(results)
+
+    print(f"{'workers':>8}{'seconds':>10}{'chunks':>8}{'peak RSS +MB':>15}")
+    for workers in args.workers:
+        elapsed, chunks, rss_mb = results[workers]
+        print(f"{workers:>8}{elapsed:>10.2f}{chunks:>8}{rss_mb:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Scraping throughput against the local HTTP fixture: one worker at the old
+one-request-per-second pace versus the concurrent, pooled fetcher
+
+Usage: python -m benchmarks.bench_scraper --pages 40 --latency-ms 50
+"""
+import argparse
+import time
+from benchmarks.http_fixture import serve_fixture, synthetic_page
+from web_scraper import ICICIWebScraper
+
+
+def run(base_url: str, paths, workers: int, rate: float) -> float:
+    scraper = ICICIWebScraper(base_url=base_url, max_pages=len(paths), max_workers=workers,
+                              requests_per_second=rate, allowed_domain="127.0.0.1")
+    start = time.perf_counter()
+    scraper.scrape_important_pages([base_url + path for path in paths])
+    elapsed = time.perf_counter() - start
+    assert len(scraper.scraped_content) == len(paths)
+    return len(paths) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent web scraping offline")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rate", type=float, default=20.0, help="requests/second per host")
+    args = parser.parse_args()
+
+    paths = [f"/page-{i}.html" for i in range(args.pages)]
+    pages = {path: synthetic_page(path) for path in paths}
+
+    with serve_fixture(pages, latency_ms=args.latency_ms) as base_url:
+        results = [("sequential, 1 req/s", run(base_url, paths, 1, 1.0))]
+        for workers in args.workers:
+            results.append((f"{workers} workers, {args.rate:g} req/s", run(base_url, paths, workers, args.rate)))
+
+    print(f"{args.pages} pages, {args.latency_ms:g} ms server latency")
+    print(f"{'mode':<28}{'pages/s':>10}")
+    for label, pages_per_second in results:
+        print(f"{label:<28}{pages_per_second:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Recall@k and latency of the vector index backends against the exact path
+
+Usage: python -m benchmarks.bench_vector_index --chunks 20000 --queries 200
+"""
+import argparse
+from benchmarks.common import synthetic_embeddings, time_calls, recall_at_k
+from vector_index import ExactIndex, IVFIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector index backends")
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--nlist", type=int, default=128)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    corpus = synthetic_embeddings(args.chunks, args.dim)
+    queries = list(synthetic_embeddings(args.queries, args.dim, seed=1))
+
+    exact = ExactIndex()
+    exact.build(corpus)
+    exact_results = [exact.search(q, args.top_k)[0] for q in queries]
+    stats = time_calls(lambda q: exact.search(q, args.top_k), queries)
+
+    print(f"{args.chunks} chunks, {args.queries} queries, top_k={args.top_k}")
+    print(f"{'index':<20}{'recall@k':>10}{'mean ms':>10}{'p99 ms':>10}")
+    print(f"{'exact':<20}{1.0:>10.3f}{stats['mean_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+    ivf = IVFIndex(nlist=args.nlist)
+    ivf.build(corpus)
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        results = [ivf.search(q, args.top_k)[0] for q in queries]
+        recall = recall_at_k(results, exact_results, args.top_k)
+        stats = time_calls(lambda q: ivf.search(q, args.top_k), queries)
+        label = f"ivf nprobe={nprobe}"
+        print(f"{label:<20}{recall:>10.3f}{stats['mean_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Shared helpers for benchmarks
+"""
+import time
+import numpy as np
+from typing import Callable, Dict, List
+
+
+def synthetic_embeddings(n: int, dim: int = 384, n_clusters: int = 50, seed: int = 0) -> np.ndarray:
+    """Clustered random vectors that roughly mimic sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(n_clusters, size=n)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors
+
+
+def time_calls(fn: Callable, inputs: List) -> Dict[str, float]:
+    """Call fn on every input and return latency stats in milliseconds"""
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    return {
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def recall_at_k(approx: List[np.ndarray], exact: List[np.ndarray], k: int) -> float:
+    """Fraction of the exact top-k neighbours recovered by the approximate search"""
+    hits = sum(len(set(a[:k]) & set(e[:k])) for a, e in zip(approx, exact))
+    return hits / float(k * len(exact))
@@ -0,0 +1,64 @@
+"""
+Local HTTP stand-in for the ICICI website so scraping can be benchmarked offline
+"""
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from web_scraper import IMPORTANT_PATHS
+
+PARAGRAPH = (
+    "ICICI Prudential term insurance offers high life cover at affordable premiums. "
+    "Policyholders can file a claim online and receive tax benefits under Section 80C. "
+)
+
+
+def synthetic_page(path: str, paragraphs: int = 60) -> bytes:
+    """An HTML page with boilerplate around a main content block"""
+    body = "".join(f"<p>{PARAGRAPH}</p>" for _ in range(paragraphs))
+    links = "".join(f'<a href="{p}">{p}</a>' for p in IMPORTANT_PATHS)
+    html = (
+        f"<html><head><title>Fixture {path}</title>"
+        f'<meta name="description" content="Synthetic page for {path}">'
+        f"<script>var tracking = 1;</script><style>body {{}}</style></head>"
+        f"<body><header>Header</header><nav>{links}</nav>"
+        f"<main><h1>{path}</h1>{body}</main><footer>Footer</footer></body></html>"
+    )
+    return html.encode('utf-8')
+
+
+@contextmanager
+def serve_fixture(pages: Optional[Dict[str, bytes]] = None, latency_ms: float = 50.0):
+    """Serve pages (path -> HTML bytes) on a local port; yields the base URL"""
+    if pages is None:
+        pages = {path: synthetic_page(path) for path in IMPORTANT_PATHS}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000.0)
+            body = pages.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,135 @@
+"""
+Sparse BM25 index for lexical chunk retrieval
+Postings are stored in CSR form: for term t, doc_ids[indptr[t]:indptr[t + 1]] are
+the chunks containing it and weights[...] their precomputed BM25 term scores, so a
+query is a handful of vectorized scatter-adds. Exact terms the dense model blurs
+(plan names, UIN codes, "80C", "10(10D)") are matched directly. Stop words are
+neither indexed nor scored, so "what is the ..." alone never makes a chunk relevant.
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sentence_index import content_tokens
+from vector_index import top_k_indices
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.empty(0, dtype=np.int32)
+        self.weights = np.empty(0, dtype=np.float32)
+        self.idf = np.empty(0, dtype=np.float32)
+        # IDF of each posting's term, for the matched-IDF share
+        self.posting_idf = np.empty(0, dtype=np.float32)
+        self.n_docs = 0
+
+    def build(self, texts: Sequence[str]):
+        """Tokenize every chunk and build the CSR postings with precomputed BM25 weights"""
+        vocab = {}
+        term_ids = []
+        doc_ids = []
+        term_freqs = []
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(content_tokens(text))
+            doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(doc_id)
+                term_freqs.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        # Stable sort keeps each term's postings in chunk order
+        order = np.argsort(term_ids, kind='stable')
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        term_freqs = np.asarray(term_freqs, dtype=np.float32)[order]
+
+        doc_freqs = np.bincount(term_ids, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freqs, out=indptr[1:])
+
+        n_docs = len(texts)
+        idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        avg_length = doc_lengths.mean() if n_docs and doc_lengths.mean() > 0 else 1.0
+        length_norm = 1 - self.b + self.b * doc_lengths[doc_ids] / avg_length
+        weights = np.repeat(idf, doc_freqs) * term_freqs * (self.k1 + 1) / (term_freqs + self.k1 * length_norm)
+
+        self.vocab = vocab
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights.astype(np.float32)
+        self.idf = idf
+        self.posting_idf = np.repeat(idf, doc_freqs)
+        self.n_docs = n_docs
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for a query"""
+        return self._accumulate(set(content_tokens(query)), self.weights)
+
+    def _accumulate(self, terms, values: np.ndarray) -> np.ndarray:
+        """Per-chunk sum of values[...] over the postings of the given terms"""
+        totals = np.zeros(self.n_docs, dtype=np.float32)
+        for term in terms:
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # A term appears once per chunk in its postings, so plain fancy-index add is safe
+            totals[self.doc_ids[start:end]] += values[start:end]
+        return totals
+
+    def query_idf(self, query: str) -> Dict[str, float]:
+        """IDF of every distinct query term; terms absent from the corpus get the highest IDF"""
+        unseen_idf = float(np.log1p((self.n_docs + 0.5) / 0.5))
+        return {term: float(self.idf[self.vocab[term]]) if term in self.vocab else unseen_idf
+                for term in set(content_tokens(query))}
+
+    def search(self, query: str, top_k: int = 8, ranges: Optional[List[Tuple[int, int]]] = None,
+               normalize: bool = False, min_idf_share: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (indices, scores) of the top_k matching chunks, best first, optionally within
+        row ranges. With normalize, scores are divided by the query's total IDF (over
+        every query term, in the corpus or not), which is what an average-length chunk
+        containing each term once scores, and capped at 1. Chunks whose matched terms
+        carry less than min_idf_share of that IDF are dropped.
+        """
+        scores = self.scores(query)
+        if normalize or min_idf_share > 0:
+            query_idf = self.query_idf(query)
+            total_idf = max(sum(query_idf.values()), 1e-9)
+            if normalize:
+                np.minimum(scores / total_idf, 1.0, out=scores)
+            if min_idf_share > 0:
+                matched_share = self._accumulate(query_idf, self.posting_idf) / total_idf
+                scores[matched_share < min_idf_share] = 0
+        if ranges is not None:
+            allowed = np.zeros(self.n_docs, dtype=bool)
+            for start, end in ranges:
+                allowed[start:end] = True
+            scores[~allowed] = 0
+        matching = np.flatnonzero(scores > 0)
+        if len(matching) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        order = top_k_indices(scores[matching], top_k)
+        return matching[order], scores[matching[order]]
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.doc_ids.nbytes + self.weights.nbytes + self.posting_idf.nbytes
+
+
+def reciprocal_rank_fusion(rankings: List[np.ndarray], k: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+    """Fuse ranked id lists by sum of 1 / (k + rank); returns (ids, fused scores) best first"""
+    fused = {}
+    for ranking in rankings:
+        for rank, idx in enumerate(ranking):
+            fused[int(idx)] = fused.get(int(idx), 0.0) + 1.0 / (k + rank + 1)
+    ids = sorted(fused, key=fused.get, reverse=True)
+    return np.array(ids, dtype=np.int64), np.array([fused[idx] for idx in ids], dtype=np.float32)
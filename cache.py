@@ -0,0 +1,182 @@
+"""
+Thread-safe LRU cache with optional TTL and hit/miss/eviction counters,
+plus an optional SQLite tier shared across worker processes
+"""
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(query: str) -> str:
+    """Canonical cache key for a query: lowercase, no punctuation, single spaces"""
+    query = _PUNCTUATION.sub(' ', query.lower())
+    return _WHITESPACE.sub(' ', query).strip()
+
+
+def default_sizeof(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    nbytes = getattr(value, 'nbytes', None)
+    return int(nbytes) if nbytes is not None else sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by entry count and approximate bytes.
+    Entries older than ttl_seconds are treated as misses (ttl_seconds=0 disables expiry).
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 0, ttl_seconds: float = 0,
+                 sizeof: Callable[[Any], int] = default_sizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None, refreshing its recency on a hit"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, stored_at = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Insert or replace an entry, evicting least-recently-used entries to fit"""
+        size = self.sizeof(value)
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, size, time.monotonic())
+            self.current_bytes += size
+
+            while self._data and (len(self._data) > self.max_entries or
+                                  (self.max_bytes and self.current_bytes > self.max_bytes)):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._data.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        """Counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self.current_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SQLiteCache:
+    """
+    File-backed cache tier shared by every worker process on a host.
+    Values are JSON-serializable; each entry records the index version it was built against.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = 0):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._connection().execute(
+                'SELECT value, created_at FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading shared cache: {e}")
+            return None
+
+        if row is None:
+            return None
+        if self.ttl_seconds and time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any, version: str):
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (key, version, value, created_at) VALUES (?, ?, ?, ?)',
+                (key, version, json.dumps(value), time.time())
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error writing shared cache: {e}")
+
+    def prune(self, current_version: str) -> int:
+        """Drop entries built against any other index version"""
+        try:
+            conn = self._connection()
+            cursor = conn.execute('DELETE FROM cache WHERE version != ?', (current_version,))
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Error pruning shared cache: {e}")
+            return 0
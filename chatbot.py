@@ -1,174 +1,509 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Dict, Tuple
-import pickle
+import json
 import os
+import threading
+import time
 from pdf_processor import PDFProcessor
 from database import ConversationDB
 from web_scraper import ICICIWebScraper
-from faq import find_faq_answer
+from faq import find_faq_answer, FAQ_DATABASE, FAQ_MATCHER
+from semantic_faq import SemanticFAQ
+from vector_index import create_index, normalize_embeddings
+from bm25_index import BM25Index, reciprocal_rank_fusion
+from config import settings
+from embedding_batcher import EmbeddingBatcher
+from cache import LRUCache, SQLiteCache, normalize_query
+from document_registry import DocumentRegistry
+from encoders import load_encoder, encoder_id
+from chunker import SentenceChunker, tokenizer_token_counts, SPECIAL_TOKENS
+from sentence_index import SentenceIndex, query_keywords
+from chunk_store import ChunkStore, ChunkStoreBuilder, SOURCE_PDF, SOURCE_WEB
+from index_store import (save_index, load_index, load_chunk_meta, load_columns, index_exists,
+                         current_generation, chunk_hash, sha256_file, sha256_bytes)
+
+class CorpusSnapshot:
+    """
+    Everything retrieval reads for one version of the corpus. A rebuild fills a new
+    snapshot and publishes it with a single assignment; a request reads the current
+    snapshot once, so its chunk ids always resolve against the store they came from.
+    """
+    
+    def __init__(self, store: ChunkStore, embeddings=None, chunk_hashes: List[str] = None,
+                 source_hashes: Dict[str, str] = None, documents: Dict[str, Dict] = None,
+                 chunking_hash: str = "", index_version: str = ""):
+        self.store = store
+        self.embeddings = embeddings
+        self.chunk_hashes = chunk_hashes or []
+        self.source_hashes = source_hashes or {}
+        self.documents = documents or {}
+        self.chunking_hash = chunking_hash
+        self.index_version = index_version
+        self.index = None
+        self.bm25 = BM25Index()
+        self.sentence_index = SentenceIndex()
+    
+    @classmethod
+    def empty(cls) -> "CorpusSnapshot":
+        return cls(ChunkStore.empty())
 
 class ICICIInsuranceChatbot:
     def __init__(self, pdf_path: str = "ICICI_Insurance.pdf", model_name: str = "all-MiniLM-L6-v2", 
                  use_web_content: bool = True, max_pdf_chunks: int = 150, max_web_pages: int = 10):
         self.pdf_path = pdf_path
-        self.model = SentenceTransformer(model_name)
-        self.chunks = []
-        self.embeddings = None
+        # Index and FAQ caches are keyed by the embedding space, which int8 ONNX changes slightly
+        self.model_name = encoder_id(model_name, settings.encoder_backend, settings.onnx_quantized)
+        self.model = load_encoder(model_name, settings.encoder_backend,
+                                  onnx_dir=settings.onnx_model_dir, quantized=settings.onnx_quantized)
+        # Chunks are packed to the model's token limit so nothing is truncated at encode time
+        self.chunker = SentenceChunker(
+            max_tokens=settings.chunk_max_tokens or self.model.max_seq_length - SPECIAL_TOKENS,
+            overlap_tokens=settings.chunk_overlap_tokens,
+            count_tokens=tokenizer_token_counts(self.model.tokenizer)
+        )
+        self.batcher = None
+        if settings.embedding_batching:
+            self.batcher = EmbeddingBatcher(
+                self.model.encode,
+                max_batch_size=settings.embedding_max_batch_size,
+                max_wait_ms=settings.embedding_batch_window_ms
+            )
+        self.embedding_cache = None
+        if settings.embedding_cache_entries > 0:
+            self.embedding_cache = LRUCache(
+                max_entries=settings.embedding_cache_entries,
+                max_bytes=int(settings.embedding_cache_max_mb * 1024 * 1024),
+                ttl_seconds=settings.embedding_cache_ttl_seconds
+            )
+        self.response_cache = None
+        if settings.response_cache_entries > 0:
+            self.response_cache = LRUCache(
+                max_entries=settings.response_cache_entries,
+                ttl_seconds=settings.response_cache_ttl_seconds
+            )
+        self.shared_response_cache = None
+        if settings.response_cache_path:
+            self.shared_response_cache = SQLiteCache(
+                settings.response_cache_path,
+                ttl_seconds=settings.response_cache_ttl_seconds
+            )
+        self.corpus = CorpusSnapshot.empty()
+        # Serializes rebuilds; requests never wait on it
+        self._rebuild_lock = threading.Lock()
         self.db = ConversationDB()
-        self.embeddings_file = "embeddings.pkl"
-        self.chunks_file = "chunks.pkl"
+        if settings.write_behind_enabled:
+            self.db.start_write_behind(
+                max_buffer=settings.write_behind_buffer,
+                batch_size=settings.write_behind_batch_size,
+                flush_interval_ms=settings.write_behind_flush_ms,
+                overflow=settings.write_behind_overflow
+            )
+        self.index_dir = settings.index_path
+        self.registry = DocumentRegistry(settings.documents_dir, extra_paths=[pdf_path])
+        # "lexical" answers from BM25 alone and never encodes queries
+        self.retrieval_mode = settings.retrieval_mode.lower()
         self.use_web_content = use_web_content
         self.max_pdf_chunks = max_pdf_chunks
         self.max_web_pages = max_web_pages
         
         # Load or create embeddings
         self.load_or_create_embeddings()
+        
+        # Embedded FAQ questions catch paraphrases before chunk retrieval
+        self.semantic_faq = None
+        if settings.semantic_faq_enabled:
+            self.semantic_faq = SemanticFAQ(FAQ_MATCHER, threshold=settings.semantic_faq_threshold)
+            self.semantic_faq.build(self.model.encode, self.model_name, self.index_dir)
+        self.faq_version = self.faq_config_hash()
     
     def load_or_create_embeddings(self):
         """Load existing embeddings or create new ones"""
-        if os.path.exists(self.embeddings_file) and os.path.exists(self.chunks_file):
+        if index_exists(self.index_dir):
             print("Loading existing embeddings...")
             self.load_embeddings()
+            if settings.refresh_index_on_startup:
+                print("Refreshing embeddings incrementally...")
+                self.create_embeddings()
         else:
             print("Creating new embeddings...")
             self.create_embeddings()
     
+    @property
+    def store(self) -> ChunkStore:
+        return self.corpus.store
+    
+    def filter_ranges(self, document: str = None, product: str = None,
+                      corpus: CorpusSnapshot = None) -> List[Tuple[int, int]]:
+        """Row ranges of the registered documents matching a doc_id and/or product"""
+        corpus = corpus or self.corpus
+        paths = [
+            path for path, meta in corpus.documents.items()
+            if (not document or meta.get('doc_id') == document)
+            and (not product or meta.get('product', '').lower() == product.lower())
+        ]
+        return corpus.store.ranges(corpus.store.mask(source_type=SOURCE_PDF, sources=paths))
+    
+    def build_index(self, corpus: CorpusSnapshot):
+        """Build the configured vector index, the BM25 index and the sentence index over a snapshot's chunks"""
+        index_kwargs = {}
+        if settings.vector_index.lower() == "ivf":
+            index_kwargs = {"nlist": settings.ivf_nlist, "nprobe": settings.ivf_nprobe}
+        elif settings.vector_index.lower() in ("int8", "binary"):
+            index_kwargs = {"rerank": settings.quantized_rerank}
+        
+        corpus.index = create_index(settings.vector_index, **index_kwargs)
+        corpus.index.build(corpus.embeddings)
+        corpus.bm25.build(corpus.store.texts)
+        corpus.sentence_index = SentenceIndex(corpus.store.texts)
+        print(f"Built {settings.vector_index} vector index over {len(corpus.index)} chunks "
+              f"and BM25 postings for {len(corpus.bm25.vocab)} terms ({corpus.bm25.nbytes / 1024:.0f} KB)")
+    
     def create_embeddings(self):
-        """Process PDF and web content, then create embeddings"""
-        all_chunks = []
-        
-        # Process PDF
-        print(f"Processing PDF (max {self.max_pdf_chunks} chunks)...")
-        processor = PDFProcessor(self.pdf_path, max_chunks=self.max_pdf_chunks)
-        pdf_chunks = processor.process_pdf()
-        
-        if pdf_chunks:
-            # Add source tag to PDF chunks
-            pdf_chunks = [f"[PDF] {chunk}" for chunk in pdf_chunks]
-            all_chunks.extend(pdf_chunks)
-            print(f"Added {len(pdf_chunks)} chunks from PDF")
+        """
+        Process PDF and web content, then create embeddings.
+        Sources whose content hash is unchanged since the loaded index reuse their
+        chunks, and chunks whose text is unchanged reuse their embedding rows.
+        A change in chunking settings re-chunks every source. The new corpus is
+        built on the side and swapped in whole, so requests keep being served.
+        """
+        with self._rebuild_lock:
+            self._create_embeddings()
+    
+    def _create_embeddings(self):
+        start_time = time.perf_counter()
+        
+        # Embedding row for each known chunk hash
+        current = self.corpus
+        previous_rows = {}
+        for row, digest in enumerate(current.chunk_hashes):
+            previous_rows.setdefault(digest, row)
+        previous = current.store
+        previous_hashes = current.source_hashes
+        chunking_hash = self.chunking_config_hash()
+        if previous_hashes and chunking_hash != current.chunking_hash:
+            print("Chunking settings changed since the index was built, re-chunking all sources")
+            previous_hashes = {}
+        self.chunker.reset_stats()
+        
+        builder = ChunkStoreBuilder()
+        source_hashes = {}
+        documents = {}
+        
+        # Process every registered PDF (each skipped entirely when its file is unchanged)
+        for document in self.registry.documents():
+            path = document['path']
+            pdf_hash = sha256_file(path)
+            rows = previous.source_rows(path)
+            if pdf_hash == previous_hashes.get(path) and len(rows):
+                pdf_chunks = [previous.texts[row] for row in rows]
+                pages = previous.pages[rows]
+                print(f"{document['doc_id']}: unchanged, reusing {len(pdf_chunks)} chunks")
+            else:
+                print(f"Processing PDF {path} (max {self.max_pdf_chunks} chunks)...")
+                processor = PDFProcessor(path, max_chunks=self.max_pdf_chunks,
+                                         workers=settings.pdf_workers, chunker=self.chunker)
+                pdf_chunks = processor.process_pdf()
+                pages = processor.chunk_pages
+            
+            if pdf_chunks:
+                builder.add(path, SOURCE_PDF, pdf_chunks, pages)
+                source_hashes[path] = pdf_hash
+                documents[path] = document
+                print(f"Added {len(pdf_chunks)} chunks from {document['doc_id']}")
         
         # Scrape and process web content
         if self.use_web_content:
-            print(f"Scraping ICICI website (max {self.max_web_pages} pages)...")
+            max_pages = settings.crawl_max_pages if settings.crawl_enabled else self.max_web_pages
+            print(f"Scraping ICICI website (max {max_pages} pages)...")
+            scraper = None
             try:
-                scraper = ICICIWebScraper(max_pages=self.max_web_pages)
-                scraper.scrape_important_pages()
-                web_chunks = scraper.create_chunks_from_web_content()
+                scraper = ICICIWebScraper(
+                    max_pages=max_pages,
+                    max_workers=settings.scraper_workers,
+                    requests_per_second=settings.scraper_requests_per_second,
+                    max_retries=settings.scraper_max_retries,
+                    cache_dir=settings.http_cache_dir or None,
+                    extractor=settings.html_extractor,
+                    chunker=self.chunker
+                )
+                if settings.crawl_enabled:
+                    # Pages stream in from the crawler and are chunked as they arrive
+                    pages = scraper.crawl(max_depth=settings.crawl_max_depth,
+                                          use_sitemap=settings.crawl_use_sitemap)
+                else:
+                    pages = scraper.scrape_important_pages()
                 
-                if web_chunks:
-                    # Limit web chunks to maintain total around 200
-                    remaining_capacity = 200 - len(all_chunks)
-                    web_chunks = web_chunks[:remaining_capacity]
+                pdf_count = len(builder)
+                unchanged_pages = 0
+                for page in pages:
+                    url = page['url']
+                    page_hash = sha256_bytes(f"{page['title']}\n{page['description']}\n{page['content']}".encode('utf-8'))
+                    rows = previous.source_rows(url)
+                    if page_hash == previous_hashes.get(url) and len(rows):
+                        page_chunks = [previous.texts[row] for row in rows]
+                        unchanged_pages += 1
+                    else:
+                        page_chunks = scraper.create_chunks_from_page(page)
                     
-                    # Add source tag to web chunks
-                    web_chunks = [f"[WEB] {chunk}" for chunk in web_chunks]
-                    all_chunks.extend(web_chunks)
-                    print(f"Added {len(web_chunks)} chunks from website")
+                    builder.add(url, SOURCE_WEB, page_chunks)
+                    source_hashes[url] = page_hash
+                
+                if len(builder) > pdf_count:
+                    print(f"Added {len(builder) - pdf_count} chunks from website ({unchanged_pages} pages unchanged)")
             except Exception as e:
                 print(f"Warning: Could not scrape web content: {e}")
-                print("Continuing with PDF content only...")
-        
+                print("Keeping previously indexed pages...")
+            
+            # A page missing from this scrape is only dropped when it is confirmed gone;
+            # pages that failed to fetch (timeouts, 5xx, a failed scrape) keep their old chunks
+            removed_urls = scraper.removed_urls if scraper else set()
+            carried = 0
+            for url in previous.sources:
+                rows = previous.source_rows(url)
+                if url in source_hashes or url in removed_urls or not len(rows) \
+                        or previous.source_types[rows[0]] != SOURCE_WEB:
+                    continue
+                builder.add(url, SOURCE_WEB, [previous.texts[row] for row in rows])
+                # An empty hash re-chunks the page on its next successful fetch
+                source_hashes[url] = previous_hashes.get(url, "")
+                carried += 1
+            if carried:
+                print(f"Kept {carried} previously indexed pages that could not be fetched")
+        
+        store = builder.build()
+        all_chunks = store.texts
         if not all_chunks:
             raise Exception("No chunks created from any source")
         
-        self.chunks = all_chunks
-        
-        # Create embeddings
-        print(f"Creating embeddings for {len(self.chunks)} total chunks...")
-        self.embeddings = self.model.encode(self.chunks)
+        # Reuse embedding rows for unchanged chunks, encode only new or changed ones
+        chunk_hashes = [chunk_hash(chunk) for chunk in all_chunks]
+        embeddings = np.empty((len(all_chunks), self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        new_rows = []
+        for row, digest in enumerate(chunk_hashes):
+            if digest in previous_rows:
+                embeddings[row] = current.embeddings[previous_rows[digest]]
+            else:
+                new_rows.append(row)
         
-        # Save embeddings and chunks
-        self.save_embeddings()
-        print(f"✅ Successfully created embeddings for {len(self.chunks)} chunks")
-        print(f"   - PDF chunks: {len([c for c in self.chunks if c.startswith('[PDF]')])}")
-        print(f"   - Web chunks: {len([c for c in self.chunks if c.startswith('[WEB]')])}")
-    
-    def save_embeddings(self):
-        """Save embeddings and chunks to files"""
-        with open(self.embeddings_file, 'wb') as f:
-            pickle.dump(self.embeddings, f)
+        print(f"Creating embeddings for {len(new_rows)} new or changed chunks "
+              f"({len(all_chunks) - len(new_rows)} reused, "
+              f"{len(set(previous_rows) - set(chunk_hashes))} removed)...")
+        if new_rows:
+            embeddings[new_rows] = normalize_embeddings(self.model.encode([all_chunks[row] for row in new_rows]))
         
-        with open(self.chunks_file, 'wb') as f:
-            pickle.dump(self.chunks, f)
+        corpus = CorpusSnapshot(store, embeddings, chunk_hashes=chunk_hashes, source_hashes=source_hashes,
+                                documents=documents, chunking_hash=chunking_hash)
         
-        print("Embeddings saved successfully")
+        # Save embeddings and chunks, then serve from the memory-mapped copy so the float
+        # matrix is shared through the page cache instead of held in this process
+        self.save_embeddings(corpus)
+        try:
+            corpus = self._load_corpus()
+        except Exception as e:
+            print(f"Could not memory-map the saved index, serving from memory: {e}")
+            self.build_index(corpus)
+        
+        # Publish the new corpus, then drop responses built from the old one
+        self.corpus = corpus
+        self.invalidate_response_cache()
+        counts = store.counts()
+        print(f"✅ Successfully created embeddings for {len(store)} chunks "
+              f"in {time.perf_counter() - start_time:.1f}s")
+        print(f"   - PDF chunks: {counts['PDF']}")
+        print(f"   - Web chunks: {counts['Website']}")
+        chunk_stats = self.chunker.stats()
+        print(f"   - Newly chunked: {chunk_stats['chunks']} chunks, {chunk_stats['mean_tokens']:.0f} tokens on average, "
+              f"{chunk_stats['split_sentences']} over-long sentences split, "
+              f"{chunk_stats['truncated_chunks']} over the {self.chunker.max_tokens}-token limit")
+    
+    def chunking_config_hash(self) -> str:
+        """Fingerprint of the settings that shape chunks; reused chunks must come from the same ones"""
+        config = dict(self.chunker.config(), max_pdf_chunks=self.max_pdf_chunks)
+        return sha256_bytes(json.dumps(config, sort_keys=True).encode('utf-8'))
+    
+    def refresh_embeddings(self):
+        """Incrementally rebuild the index from the current PDF and website content"""
+        if not len(self.corpus.store) and index_exists(self.index_dir):
+            self.load_embeddings()
+        self.create_embeddings()
+    
+    def save_embeddings(self, corpus: CorpusSnapshot = None):
+        """Save a snapshot's embeddings and chunks to the on-disk index"""
+        corpus = corpus or self.corpus
+        manifest = save_index(self.index_dir, corpus.embeddings, corpus.store.texts,
+                              model_name=self.model_name, sources=corpus.source_hashes,
+                              columns=corpus.store.columns(), source_table=corpus.store.sources,
+                              documents=corpus.documents, chunking=corpus.chunking_hash)
+        corpus.index_version = manifest["content_hash"]
+        print(f"Embeddings saved successfully to {self.index_dir}")
+    
+    def _load_corpus(self) -> CorpusSnapshot:
+        """Memory-map the committed index into a snapshot and build its search indexes"""
+        # Every file comes from the same generation, even if another worker saves meanwhile
+        generation = current_generation(self.index_dir)
+        embeddings, chunks, manifest = load_index(generation, model_name=self.model_name)
+        chunk_meta = load_chunk_meta(generation, chunks)
+        store = ChunkStore(chunks, sources=chunk_meta["source_table"],
+                           **load_columns(generation, len(chunks)))
+        corpus = CorpusSnapshot(store, normalize_embeddings(embeddings),
+                                chunk_hashes=chunk_meta["hashes"],
+                                source_hashes=manifest.get("sources", {}),
+                                documents=manifest.get("documents", {}),
+                                chunking_hash=manifest.get("chunking", ""),
+                                index_version=manifest.get("content_hash", ""))
+        self.build_index(corpus)
+        return corpus
     
     def load_embeddings(self):
-        """Load embeddings and chunks from files"""
+        """Memory-map embeddings and chunks from the on-disk index"""
         try:
-            with open(self.embeddings_file, 'rb') as f:
-                self.embeddings = pickle.load(f)
-            
-            with open(self.chunks_file, 'rb') as f:
-                self.chunks = pickle.load(f)
-            
-            print(f"Loaded embeddings for {len(self.chunks)} chunks")
+            self.corpus = self._load_corpus()
+            print(f"Loaded embeddings for {len(self.corpus.store)} chunks")
         except Exception as e:
             print(f"Error loading embeddings: {e}")
             self.create_embeddings()
     
-    def find_relevant_chunks(self, query: str, top_k: int = 8) -> List[Tuple[str, float]]:
-        """Find most relevant chunks for a query"""
-        # Encode the query
-        query_embedding = self.model.encode([query])
-        
-        # Calculate similarities
-        similarities = cosine_similarity(query_embedding, self.embeddings)[0]
-        
-        # Get top-k most similar chunks
-        top_indices = np.argsort(similarities)[::-1][:top_k]
-        
-        relevant_chunks = []
-        for idx in top_indices:
-            relevant_chunks.append((self.chunks[idx], similarities[idx]))
+    def encode_query(self, query: str):
+        """Encode a single query, using the embedding cache and batcher when enabled"""
+        # Encode the normalized text so repeats and near-repeats share one embedding
+        key = normalize_query(query) or query
+        if self.embedding_cache:
+            cached = self.embedding_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        if self.batcher:
+            embedding = self.batcher.encode(key)
+        else:
+            embedding = self.model.encode([key])[0]
         
-        return relevant_chunks
+        if self.embedding_cache:
+            self.embedding_cache.put(key, embedding)
+        return embedding
+    
+    def try_encode_query(self, query: str):
+        """Query embedding, or None when dense retrieval is off or the model fails"""
+        if self.retrieval_mode == "lexical":
+            return None
+        try:
+            return self.encode_query(query)
+        except Exception as e:
+            print(f"Query encoding failed, answering from BM25 only: {e}")
+            return None
+    
+    def find_relevant_chunks(self, query: str, top_k: int = 8, document: str = None, product: str = None,
+                             query_embedding=None, corpus: CorpusSnapshot = None) -> List[Tuple[int, float]]:
+        """
+        Find the chunk ids most relevant to a query, best first, optionally
+        limited to one document or product. Dense and BM25 rankings are fused
+        with reciprocal rank fusion; without a query embedding only BM25 is used.
+        Each retriever drops candidates below its own relevance threshold before
+        fusion, so a chunk only BM25 finds survives on its BM25 score alone.
+        Scores are cosine similarity (dense), normalized BM25 (lexical) or RRF (hybrid).
+        """
+        corpus = corpus or self.corpus
+        # Only the matching documents' rows are scored when a filter is given
+        ranges = self.filter_ranges(document, product, corpus) if document or product else None
+        
+        # Encode the query unless the caller already has its embedding
+        if query_embedding is None:
+            query_embedding = self.try_encode_query(query)
+        
+        if query_embedding is None:
+            # Lexical-only fast path
+            top_indices, scores = corpus.bm25.search(query, top_k=top_k, ranges=ranges, normalize=True,
+                                                     min_idf_share=settings.bm25_min_idf_share)
+            return [(int(idx), float(score)) for idx, score in zip(top_indices, scores)
+                    if score >= settings.bm25_min_score]
+        
+        # Hybrid mode draws a deeper candidate list from each retriever before fusing
+        candidates = top_k if self.retrieval_mode == "dense" else top_k * 4
+        if ranges is not None:
+            top_indices, scores = corpus.index.search_ranges(query_embedding, ranges, top_k=candidates)
+        else:
+            top_indices, scores = corpus.index.search(query_embedding, top_k=candidates)
+        relevant = scores >= settings.similarity_threshold
+        top_indices, scores = top_indices[relevant], scores[relevant]
+        
+        if self.retrieval_mode != "dense":
+            lexical_indices, lexical_scores = corpus.bm25.search(query, top_k=candidates, ranges=ranges,
+                                                                 normalize=True,
+                                                                 min_idf_share=settings.bm25_min_idf_share)
+            lexical_indices = lexical_indices[lexical_scores >= settings.bm25_min_score]
+            top_indices, scores = reciprocal_rank_fusion([top_indices, lexical_indices], k=settings.rrf_k)
+            top_indices, scores = top_indices[:top_k], scores[:top_k]
+        
+        return [(int(idx), float(score)) for idx, score in zip(top_indices, scores)]
+    
+    def faq_config_hash(self) -> str:
+        """Fingerprint of the FAQ table and semantic tier settings; cached FAQ answers depend on both"""
+        config = {
+            "faqs": FAQ_DATABASE,
+            "semantic_faq": self.semantic_faq.content_hash(self.model_name) if self.semantic_faq else None,
+            "semantic_faq_threshold": settings.semantic_faq_threshold if self.semantic_faq else None,
+        }
+        return sha256_bytes(json.dumps(config, sort_keys=True).encode('utf-8'))[:16]
+    
+    def response_cache_key(self, query: str, document: str = None, product: str = None,
+                           corpus: CorpusSnapshot = None) -> str:
+        """Cache key for a response: index and FAQ versions, retrieval filters and normalized query"""
+        corpus = corpus or self.corpus
+        return f"{corpus.index_version}:{self.faq_version}:{document or ''}:{(product or '').lower()}:{normalize_query(query)}"
     
-    def generate_response(self, query: str, relevant_chunks: List[Tuple[str, float]], 
-                         conversation_context: str = "") -> str:
-        """Generate response based on relevant chunks and context"""
-        # Filter chunks with similarity above threshold (lowered for better recall)
-        filtered_chunks = [(chunk, score) for chunk, score in relevant_chunks if score > 0.25]
+    def get_cached_response(self, key: str) -> Dict:
+        """Look up a response in the in-process cache, then the shared tier"""
+        cached = self.response_cache.get(key) if self.response_cache else None
+        if cached is None and self.shared_response_cache:
+            cached = self.shared_response_cache.get(key)
+            if cached is not None and self.response_cache:
+                self.response_cache.put(key, cached)
+        return cached
+    
+    def store_cached_response(self, key: str, entry: Dict, version: str = None):
+        """Store a response in every enabled cache tier, tagged with the corpus version it came from"""
+        if self.response_cache:
+            self.response_cache.put(key, entry)
+        if self.shared_response_cache:
+            self.shared_response_cache.put(key, entry, self.corpus.index_version if version is None else version)
+    
+    def invalidate_response_cache(self):
+        """Forget responses computed against a previous version of the corpus"""
+        if self.response_cache:
+            self.response_cache.clear()
+        if self.shared_response_cache:
+            self.shared_response_cache.prune(self.corpus.index_version)
+    
+    def generate_response(self, query: str, relevant_chunks: List[Tuple[int, float]], 
+                         conversation_context: str = "", corpus: CorpusSnapshot = None) -> str:
+        """Generate response based on relevant chunk ids and context"""
+        corpus = corpus or self.corpus
+        # find_relevant_chunks has already applied each retriever's relevance threshold
+        filtered_chunks = [chunk_id for chunk_id, _ in relevant_chunks]
         
         if not filtered_chunks:
             return ("I apologize, but I couldn't find relevant information in the ICICI Insurance "
                    "documentation and website to answer your question. Could you please rephrase your question "
                    "or ask about specific ICICI Insurance products or services?")
         
-        # Separate sources
-        sources = []
-        clean_chunks = []
-        
         # Use top 5 chunks instead of 3 for better context
-        for chunk, score in filtered_chunks[:5]:
-            if chunk.startswith('[PDF]'):
-                sources.append('PDF')
-                clean_chunks.append(chunk.replace('[PDF] ', ''))
-            elif chunk.startswith('[WEB]'):
-                sources.append('Website')
-                clean_chunks.append(chunk.replace('[WEB] ', ''))
-            else:
-                clean_chunks.append(chunk)
-        
-        # Create context from relevant chunks
-        context = "\n\n".join(clean_chunks[:5])
+        top_ids = filtered_chunks[:5]
+        sources = corpus.store.labels(top_ids)
         
-        # Simple response generation based on context
-        response = self.create_contextual_response(query, context, conversation_context)
+        # Simple response generation based on the relevant chunks' sentences
+        response = self.create_contextual_response(query, top_ids, conversation_context, corpus)
         
         # Add source information if available
-        unique_sources = list(set(sources))
+        unique_sources = sorted(set(sources))
         if unique_sources:
             source_text = " and ".join(unique_sources)
             response += f"\n\n📚 Source: {source_text}"
         
         return response
     
-    def create_contextual_response(self, query: str, context: str, conversation_context: str) -> str:
-        """Create a contextual response based on the query and retrieved information"""
+    def create_contextual_response(self, query: str, chunk_ids: List[int], conversation_context: str,
+                                   corpus: CorpusSnapshot = None) -> str:
+        """Create a contextual response based on the query and the retrieved chunks"""
+        corpus = corpus or self.corpus
         query_lower = query.lower()
         
         # Handle greetings
@@ -178,58 +513,42 @@ class ICICIInsuranceChatbot:
         if "thank" in query_lower:
             return "You're welcome! Feel free to ask if you have any other questions about ICICI Insurance."
         
-        # Clean up context - remove source tags and extra whitespace
-        context = context.replace('[PDF]', '').replace('[WEB]', '')
-        # Remove source prefixes like "From Life Insurance - ICICI Prudential..."
-        import re
-        context = re.sub(r'From [^:]+:\s*', '', context)
-        context = re.sub(r'Source: [^.]+\.', '', context)
-        sentences = [s.strip() for s in context.split('.') if s.strip()]
-        
-        # Extract query keywords (filter out common words)
-        stop_words = {'what', 'is', 'are', 'the', 'how', 'can', 'do', 'does', 'tell', 'me', 'about', 'a', 'an', 'and', 'or', 'in', 'on', 'for', 'to', 'of', 'with'}
-        query_keywords = [word for word in query_lower.split() if word not in stop_words and len(word) > 2]
+        # Sentences were split, cleaned and filtered when the index was built
+        sentences = corpus.sentence_index.sentences_for(chunk_ids)
+        keywords = query_keywords(query_lower)
         
         # Score sentences based on keyword matches and position
         scored_sentences = []
         for i, sentence in enumerate(sentences[:15]):  # Limit to first 15 sentences
-            if len(sentence) < 20:  # Skip very short sentences
+            # Skip very short or long sentences, technical jargon and UIN codes
+            if not sentence.eligible:
                 continue
             
-            # Skip sentences with technical jargon or UIN codes
-            if 'UIN:' in sentence or 'WII' in sentence or len(sentence) > 500:
-                continue
-            
-            sentence_lower = sentence.lower()
-            score = 0
-            
             # Score based on keyword matches
-            for keyword in query_keywords:
-                if keyword in sentence_lower:
-                    score += 3
+            score = 3 * len(keywords & sentence.tokens)
             
             # Prefer earlier sentences (they're usually more relevant)
             score += (15 - i) * 0.2
             
             # Prefer sentences with specific terms
-            if any(term in sentence_lower for term in ['benefit', 'cover', 'premium', 'claim', 'policy', 'insurance']):
+            if sentence.has_domain_term:
                 score += 1.5
             
             # Boost sentences that look like answers
-            if any(phrase in sentence_lower for phrase in ['you can', 'offers', 'provides', 'includes', 'available']):
+            if sentence.has_answer_phrase:
                 score += 2
             
-            scored_sentences.append((sentence, score))
+            scored_sentences.append((sentence.text, score))
         
         # Sort by score and take top sentences
         scored_sentences.sort(key=lambda x: x[1], reverse=True)
         top_sentences = [s[0] for s in scored_sentences[:4]]
         
         if not top_sentences:
-            return "Based on the available information, " + sentences[0] if sentences else "I couldn't find specific information about that."
+            return "Based on the available information, " + sentences[0].text if sentences else "I couldn't find specific information about that."
         
         # Build response based on query type
-        response = self._build_structured_response(query_lower, top_sentences, query_keywords)
+        response = self._build_structured_response(query_lower, top_sentences, sorted(keywords))
         
         return response
     
@@ -304,19 +623,47 @@ class ICICIInsuranceChatbot:
         
         return response
     
-    def chat(self, query: str, session_id: str) -> Dict:
-        """Main chat method"""
+    def chat(self, query: str, session_id: str, document: str = None, product: str = None) -> Dict:
+        """Main chat method; document/product optionally restrict retrieval"""
         try:
             # Create session if it doesn't exist
             self.db.create_session(session_id)
             
+            # One snapshot for the whole request, even if a rebuild swaps in a new corpus meanwhile
+            corpus = self.corpus
+            
+            # Answers depend only on the query and the corpus, so repeats are served from cache
+            cache_key = self.response_cache_key(query, document, product, corpus)
+            cached = self.get_cached_response(cache_key)
+            if cached:
+                self.db.add_conversation(session_id, query, cached["stored_response"], cached["context_chunks"])
+                return {
+                    "response": cached["response"],
+                    "relevant_chunks": cached["relevant_chunks"],
+                    "session_id": session_id,
+                    "status": "success"
+                }
+            
             # Check FAQ database first for common questions
             faq_answer = find_faq_answer(query)
+            query_embedding = None
+            if not faq_answer and self.semantic_faq:
+                # Paraphrased FAQs match by embedding; the embedding is reused for retrieval
+                query_embedding = self.try_encode_query(query)
+                if query_embedding is not None:
+                    faq_answer = self.semantic_faq.answer(query_embedding)
             if faq_answer:
                 # Store FAQ conversation in database
                 self.db.add_conversation(session_id, query, faq_answer, ["FAQ"])
+                response = faq_answer + "\n\n📚 Source: FAQ"
+                self.store_cached_response(cache_key, {
+                    "response": response,
+                    "stored_response": faq_answer,
+                    "relevant_chunks": 1,
+                    "context_chunks": ["FAQ"]
+                }, corpus.index_version)
                 return {
-                    "response": faq_answer + "\n\n📚 Source: FAQ",
+                    "response": response,
                     "relevant_chunks": 1,
                     "session_id": session_id,
                     "status": "success"
@@ -326,14 +673,21 @@ class ICICIInsuranceChatbot:
             conversation_context = self.db.get_recent_context(session_id, limit=3)
             
             # Find relevant chunks
-            relevant_chunks = self.find_relevant_chunks(query, top_k=8)
+            relevant_chunks = self.find_relevant_chunks(query, top_k=8, document=document, product=product,
+                                                        query_embedding=query_embedding, corpus=corpus)
             
             # Generate response
-            response = self.generate_response(query, relevant_chunks, conversation_context)
+            response = self.generate_response(query, relevant_chunks, conversation_context, corpus)
             
             # Store conversation in database
-            context_chunks = [chunk for chunk, _ in relevant_chunks[:3]]
+            context_chunks = [corpus.store.texts[chunk_id] for chunk_id, _ in relevant_chunks[:3]]
             self.db.add_conversation(session_id, query, response, context_chunks)
+            self.store_cached_response(cache_key, {
+                "response": response,
+                "stored_response": response,
+                "relevant_chunks": len(relevant_chunks),
+                "context_chunks": context_chunks
+            }, corpus.index_version)
             
             return {
                 "response": response,
@@ -355,6 +709,20 @@ class ICICIInsuranceChatbot:
         """Get conversation history for a session"""
         return self.db.get_conversation_history(session_id)
     
+    def cache_stats(self) -> Dict:
+        """Hit/miss/eviction counters for the chatbot caches and the semantic FAQ tier"""
+        return {
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "semantic_faq": self.semantic_faq.stats() if self.semantic_faq else None
+        }
+    
+    def close(self):
+        """Stop background workers"""
+        if self.batcher:
+            self.batcher.close()
+        self.db.close()
+    
     def cleanup_files(self):
         """Clean up temporary files"""
         files_to_remove = ["processed_chunks.txt"]
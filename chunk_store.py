@@ -0,0 +1,106 @@
+"""
+Columnar chunk store
+Chunk text is kept apart from its metadata, which lives in parallel numpy arrays
+(source type, source id, page number) indexed by chunk id. Retrieval works in chunk
+ids, and sources are filtered and attributed with vectorized masks over the arrays
+instead of string tags embedded in the chunk text.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+SOURCE_PDF = 0
+SOURCE_WEB = 1
+SOURCE_LABELS = {SOURCE_PDF: 'PDF', SOURCE_WEB: 'Website'}
+
+# Page number stored for chunks that do not come from a paginated document
+NO_PAGE = -1
+
+
+class ChunkStore:
+    """
+    Chunk text plus per-chunk columns:
+        source_types - uint8 SOURCE_PDF / SOURCE_WEB
+        source_ids   - int32 index into sources (PDF path or page URL)
+        pages        - int32 1-based PDF page a chunk starts on, NO_PAGE for web chunks
+    """
+
+    def __init__(self, texts: Sequence[str], source_types: np.ndarray, source_ids: np.ndarray,
+                 pages: np.ndarray, sources: List[str]):
+        if not len(texts) == len(source_types) == len(source_ids) == len(pages):
+            raise ValueError("chunk columns must all have one entry per chunk")
+        self.texts = texts
+        self.source_types = np.asarray(source_types, dtype=np.uint8)
+        self.source_ids = np.asarray(source_ids, dtype=np.int32)
+        self.pages = np.asarray(pages, dtype=np.int32)
+        self.sources = list(sources)
+        self.source_index = {source: i for i, source in enumerate(self.sources)}
+
+    @classmethod
+    def empty(cls) -> 'ChunkStore':
+        return cls([], [], [], [], [])
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The per-chunk arrays, for persisting alongside the chunk text"""
+        return {"source_types": self.source_types, "source_ids": self.source_ids, "pages": self.pages}
+
+    def mask(self, source_type: Optional[int] = None, sources: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Boolean row mask selecting chunks of one source type and/or from the given sources"""
+        mask = np.ones(len(self), dtype=bool)
+        if source_type is not None:
+            mask &= self.source_types == source_type
+        if sources is not None:
+            ids = [self.source_index[source] for source in sources if source in self.source_index]
+            mask &= np.isin(self.source_ids, ids)
+        return mask
+
+    @staticmethod
+    def ranges(mask: np.ndarray) -> List[Tuple[int, int]]:
+        """Contiguous (start, end) row ranges where mask is True"""
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+        return [(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2])]
+
+    def source_rows(self, source: str) -> np.ndarray:
+        """Chunk ids belonging to one source, in order"""
+        if source not in self.source_index:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.source_ids == self.source_index[source])
+
+    def labels(self, chunk_ids: Sequence[int]) -> List[str]:
+        """Human-readable source type of each chunk id"""
+        return [SOURCE_LABELS[int(t)] for t in self.source_types[np.asarray(chunk_ids, dtype=np.int64)]]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of chunks per source type"""
+        counts = np.bincount(self.source_types, minlength=len(SOURCE_LABELS))
+        return {label: int(counts[source_type]) for source_type, label in SOURCE_LABELS.items()}
+
+
+class ChunkStoreBuilder:
+    """Accumulates chunks source by source, then freezes them into a ChunkStore"""
+
+    def __init__(self):
+        self.texts = []
+        self.source_types = []
+        self.source_ids = []
+        self.pages = []
+        self.sources = []
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(self, source: str, source_type: int, texts: List[str], pages: Optional[Sequence[int]] = None):
+        """Append all chunks of one source, optionally with the page each chunk starts on"""
+        if not texts:
+            return
+        source_id = len(self.sources)
+        self.sources.append(source)
+        self.texts.extend(texts)
+        self.source_types.extend([source_type] * len(texts))
+        self.source_ids.extend([source_id] * len(texts))
+        self.pages.extend(pages if pages is not None else [NO_PAGE] * len(texts))
+
+    def build(self) -> ChunkStore:
+        return ChunkStore(self.texts, self.source_types, self.source_ids, self.pages, self.sources)
@@ -0,0 +1,190 @@
+"""
+Sentence-aware, token-budgeted chunking shared by the PDF and web paths
+Text is split into sentences and sentences are packed into chunks that fit the
+embedding model's token limit, so nothing is silently truncated at encode time.
+Consecutive chunks overlap by whole trailing sentences.
+"""
+import re
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Sentence end: terminal punctuation (optionally followed by a closing quote or
+# bracket) and whitespace before an uppercase letter, digit or opening quote/bracket
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])["\')\]]?\s+(?=["\'(\[]?[A-Z0-9])')
+_TERMINATED = re.compile(r'[.!?]["\')\]]?$')
+_WORD_PIECES = re.compile(r'\w+|[^\w\s]')
+
+# Special tokens ([CLS], [SEP]) the model adds around every input
+SPECIAL_TOKENS = 2
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation"""
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def approximate_token_counts(texts: List[str]) -> List[int]:
+    """
+    Conservative WordPiece token estimate for when no tokenizer is available:
+    one token per word or punctuation mark, plus one per 6 characters of long words
+    """
+    counts = []
+    for text in texts:
+        count = 0
+        for piece in _WORD_PIECES.findall(text):
+            count += 1 + max(0, len(piece) - 6) // 6
+        counts.append(count)
+    return counts
+
+
+def tokenizer_token_counts(tokenizer) -> Callable[[List[str]], List[int]]:
+    """Batched token counter backed by a Hugging Face tokenizer (e.g. SentenceTransformer.tokenizer)"""
+    def count(texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        encoded = tokenizer(texts, add_special_tokens=False, return_attention_mask=False,
+                            return_token_type_ids=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+    return count
+
+
+class SentenceChunker:
+    """
+    Packs sentences into chunks of at most max_tokens tokens (as measured by
+    count_tokens), carrying up to overlap_tokens of trailing sentences into the
+    next chunk. Sentences longer than the budget are split on word boundaries.
+    """
+
+    def __init__(self, max_tokens: int = 254, overlap_tokens: int = 32,
+                 count_tokens: Callable[[List[str]], List[int]] = approximate_token_counts):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.chunks = 0
+            self.sentences = 0
+            self.tokens = 0
+            self.largest_chunk = 0
+            self.split_sentences = 0
+            self.truncated_chunks = 0
+
+    def config(self) -> Dict:
+        """Settings that determine the chunk boundaries"""
+        return {"chunker": "sentence", "max_tokens": self.max_tokens, "overlap_tokens": self.overlap_tokens}
+
+    def stats(self) -> Dict:
+        """Chunking counters; truncated_chunks counts chunks the model would still cut off"""
+        with self._lock:
+            return {
+                "chunks": self.chunks,
+                "sentences": self.sentences,
+                "mean_tokens": self.tokens / self.chunks if self.chunks else 0.0,
+                "largest_chunk_tokens": self.largest_chunk,
+                "split_sentences": self.split_sentences,
+                "truncated_chunks": self.truncated_chunks,
+            }
+
+    def _record(self, sentences: int, tokens: int):
+        with self._lock:
+            self.chunks += 1
+            self.sentences += sentences
+            self.tokens += tokens
+            self.largest_chunk = max(self.largest_chunk, tokens)
+            if tokens > self.max_tokens:
+                self.truncated_chunks += 1
+
+    def _split_long(self, sentence: str, budget: int) -> List[Tuple[str, int]]:
+        """Split an over-budget sentence into word runs that each fit the budget"""
+        words = sentence.split()
+        word_tokens = self.count_tokens(words)
+        parts = []
+        start = 0
+        tokens = 0
+        for i, count in enumerate(word_tokens):
+            if tokens + count > budget and i > start:
+                parts.append((' '.join(words[start:i]), tokens))
+                start, tokens = i, 0
+            tokens += count
+        parts.append((' '.join(words[start:]), tokens))
+        return parts
+
+    def _sentences(self, texts: Iterable[str]) -> Iterator[Tuple[int, str, int]]:
+        """
+        Yield (piece index, sentence, tokens) across a stream of text pieces.
+        An unterminated sentence at the end of a piece (e.g. one that runs over
+        a page break) is carried into the next piece.
+        """
+        carry = ""
+        carry_piece = 0
+        for piece, text in enumerate(texts):
+            sentences = split_sentences(f"{carry} {text}" if carry else text)
+            if not sentences:
+                continue
+            start_pieces = [carry_piece if carry else piece] + [piece] * (len(sentences) - 1)
+            carry = ""
+            if not _TERMINATED.search(sentences[-1]):
+                carry = sentences.pop()
+                carry_piece = start_pieces.pop()
+            for start_piece, sentence, tokens in zip(start_pieces, sentences, self.count_tokens(sentences)):
+                yield start_piece, sentence, tokens
+        if carry:
+            yield carry_piece, carry, self.count_tokens([carry])[0]
+
+    def iter_chunks(self, texts: Iterable[str], reserved_tokens: int = 0) -> Iterator[Tuple[int, str]]:
+        """
+        Stream (piece index, chunk) from a sequence of text pieces such as PDF pages.
+        The piece index is where the chunk's first sentence starts. reserved_tokens
+        are kept free for text the caller adds to every chunk (e.g. a title prefix).
+        """
+        budget = max(self.max_tokens - reserved_tokens, self.overlap_tokens + 1)
+        window = []  # (piece, sentence, tokens)
+        window_tokens = 0
+        has_new = False
+
+        def emit():
+            text = ' '.join(sentence for _, sentence, _ in window)
+            self._record(len(window), window_tokens + reserved_tokens)
+            return window[0][0], text
+
+        def overlap_tail():
+            tail = []
+            tokens = 0
+            for entry in reversed(window):
+                if tokens + entry[2] > self.overlap_tokens:
+                    break
+                tail.insert(0, entry)
+                tokens += entry[2]
+            return tail, tokens
+
+        for piece, sentence, tokens in self._sentences(texts):
+            parts = [(sentence, tokens)]
+            if tokens > budget:
+                parts = self._split_long(sentence, budget)
+                with self._lock:
+                    self.split_sentences += 1
+
+            for part, part_tokens in parts:
+                if window and window_tokens + part_tokens > budget:
+                    yield emit()
+                    window, window_tokens = overlap_tail()
+                    # Drop overlap that would not leave room for the new sentence
+                    while window and window_tokens + part_tokens > budget:
+                        window_tokens -= window.pop(0)[2]
+                    has_new = False
+                window.append((piece, part, part_tokens))
+                window_tokens += part_tokens
+                has_new = True
+
+        if window and has_new:
+            yield emit()
+
+    def chunk(self, text: str, prefix: str = "") -> List[str]:
+        """Chunk a single text, prepending prefix to each chunk within the token budget"""
+        reserved = self.count_tokens([prefix])[0] if prefix else 0
+        return [prefix + chunk for _, chunk in self.iter_chunks([text], reserved_tokens=reserved)]
@@ -23,8 +23,35 @@ class Settings(BaseSettings):
     
     # PDF and Web Scraping
     max_pdf_chunks: int = int(os.getenv("MAX_PDF_CHUNKS", 150))
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", 4))
+    documents_dir: str = os.getenv("DOCUMENTS_DIR", "documents")
+    chunk_max_tokens: int = int(os.getenv("CHUNK_MAX_TOKENS", 0))
+    chunk_overlap_tokens: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", 32))
     max_web_pages: int = int(os.getenv("MAX_WEB_PAGES", 10))
     use_web_content: bool = os.getenv("USE_WEB_CONTENT", "true").lower() == "true"
+    scraper_workers: int = int(os.getenv("SCRAPER_WORKERS", 4))
+    scraper_requests_per_second: float = float(os.getenv("SCRAPER_REQUESTS_PER_SECOND", 2))
+    scraper_max_retries: int = int(os.getenv("SCRAPER_MAX_RETRIES", 3))
+    http_cache_dir: str = os.getenv("HTTP_CACHE_DIR", "http_cache")
+    html_extractor: str = os.getenv("HTML_EXTRACTOR", "lxml")
+    
+    # Link-following crawl mode (instead of only the built-in important pages)
+    crawl_enabled: bool = os.getenv("CRAWL_ENABLED", "false").lower() == "true"
+    crawl_max_depth: int = int(os.getenv("CRAWL_MAX_DEPTH", 2))
+    crawl_max_pages: int = int(os.getenv("CRAWL_MAX_PAGES", 200))
+    crawl_use_sitemap: bool = os.getenv("CRAWL_USE_SITEMAP", "true").lower() == "true"
+    
+    # Retrieval: hybrid (dense + BM25 fused with reciprocal rank fusion) | dense | lexical
+    retrieval_mode: str = os.getenv("RETRIEVAL_MODE", "hybrid")
+    rrf_k: int = int(os.getenv("RRF_K", 60))
+    # Relevance thresholds applied to each retriever before fusion
+    # (the dense cutoff is similarity_threshold under Model Settings)
+    bm25_min_score: float = float(os.getenv("BM25_MIN_SCORE", 0.2))
+    bm25_min_idf_share: float = float(os.getenv("BM25_MIN_IDF_SHARE", 0.5))
+    
+    # Semantic FAQ tier (cosine similarity against embedded FAQ questions)
+    semantic_faq_enabled: bool = os.getenv("SEMANTIC_FAQ_ENABLED", "true").lower() == "true"
+    semantic_faq_threshold: float = float(os.getenv("SEMANTIC_FAQ_THRESHOLD", 0.75))
     
     # Security
     secret_key: str = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
@@ -43,14 +70,51 @@ class Settings(BaseSettings):
     
     # Database
     database_path: str = os.getenv("DATABASE_PATH", "conversations.db")
-    embeddings_path: str = os.getenv("EMBEDDINGS_PATH", "embeddings.pkl")
-    chunks_path: str = os.getenv("CHUNKS_PATH", "chunks.pkl")
+    
+    # Write-behind conversation logging (overflow policy: "block" or "drop")
+    write_behind_enabled: bool = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+    write_behind_buffer: int = int(os.getenv("WRITE_BEHIND_BUFFER", 10000))
+    write_behind_batch_size: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 100))
+    write_behind_flush_ms: float = float(os.getenv("WRITE_BEHIND_FLUSH_MS", 50))
+    write_behind_overflow: str = os.getenv("WRITE_BEHIND_OVERFLOW", "block")
+    
+    # Index storage
+    index_path: str = os.getenv("INDEX_PATH", "index")
+    refresh_index_on_startup: bool = os.getenv("REFRESH_INDEX_ON_STARTUP", "false").lower() == "true"
     
     # Model Settings
     model_name: str = os.getenv("MODEL_NAME", "all-MiniLM-L6-v2")
-    similarity_threshold: float = float(os.getenv("SIMILARITY_THRESHOLD", 0.3))
+    encoder_backend: str = os.getenv("ENCODER_BACKEND", "torch")
+    onnx_model_dir: str = os.getenv("ONNX_MODEL_DIR", "")
+    onnx_quantized: bool = os.getenv("ONNX_QUANTIZED", "false").lower() == "true"
+    similarity_threshold: float = float(os.getenv("SIMILARITY_THRESHOLD", 0.25))
     top_k_chunks: int = int(os.getenv("TOP_K_CHUNKS", 5))
     
+    # Vector Index ("exact", "ivf", "int8" or "binary")
+    vector_index: str = os.getenv("VECTOR_INDEX", "exact")
+    ivf_nlist: int = int(os.getenv("IVF_NLIST", 64))
+    ivf_nprobe: int = int(os.getenv("IVF_NPROBE", 8))
+    quantized_rerank: int = int(os.getenv("QUANTIZED_RERANK", 200))
+    
+    # Query embedding micro-batching
+    embedding_batching: bool = os.getenv("EMBEDDING_BATCHING", "true").lower() == "true"
+    embedding_batch_window_ms: float = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", 5))
+    embedding_max_batch_size: int = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", 32))
+    
+    # Query embedding cache (0 entries disables it, 0 TTL never expires)
+    embedding_cache_entries: int = int(os.getenv("EMBEDDING_CACHE_ENTRIES", 10000))
+    embedding_cache_max_mb: float = float(os.getenv("EMBEDDING_CACHE_MAX_MB", 32))
+    embedding_cache_ttl_seconds: float = float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", 0))
+    
+    # Response cache (0 entries disables it; empty path disables the shared tier)
+    response_cache_entries: int = int(os.getenv("RESPONSE_CACHE_ENTRIES", 5000))
+    response_cache_ttl_seconds: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 3600))
+    response_cache_path: str = os.getenv("RESPONSE_CACHE_PATH", "")
+    
+    # Request execution (chat work runs in a bounded thread pool)
+    chat_workers: int = int(os.getenv("CHAT_WORKERS", 4))
+    chat_max_queue: int = int(os.getenv("CHAT_MAX_QUEUE", 32))
+    
     # Session Settings
     session_timeout_days: int = int(os.getenv("SESSION_TIMEOUT_DAYS", 30))
     max_conversation_history: int = int(os.getenv("MAX_CONVERSATION_HISTORY", 10))
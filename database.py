@@ -1,58 +1,261 @@
 import sqlite3
 import json
+import queue
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import os
 
+# Statements are module constants so sqlite3's per-connection statement cache reuses them
+INSERT_SESSION_SQL = '''
+    INSERT OR REPLACE INTO sessions (session_id, created_at, last_activity)
+    VALUES (?, ?, ?)
+'''
+INSERT_CONVERSATION_SQL = '''
+    INSERT INTO conversations (session_id, user_message, bot_response, timestamp, context_chunks)
+    VALUES (?, ?, ?, ?, ?)
+'''
+UPDATE_ACTIVITY_SQL = 'UPDATE sessions SET last_activity = ? WHERE session_id = ?'
+SELECT_HISTORY_SQL = '''
+    SELECT user_message, bot_response, timestamp, context_chunks
+    FROM conversations
+    WHERE session_id = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Append new (version, description, statements) entries; never edit applied ones.
+MIGRATIONS = [
+    (1, "create conversations and sessions tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            user_message TEXT NOT NULL,
+            bot_response TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            context_chunks TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_activity DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (2, "index history lookups and session cleanup", [
+        'CREATE INDEX IF NOT EXISTS idx_conversations_session_timestamp ON conversations (session_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_last_activity ON sessions (last_activity)',
+    ]),
+]
+
+
+def utc_timestamp() -> str:
+    """Timestamp in the same format as SQLite's CURRENT_TIMESTAMP"""
+    return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class WriteBehindQueue:
+    """
+    Background writer that commits queued statements in batched transactions.
+    A batch is committed once batch_size operations are queued or flush_interval_ms
+    has passed since the first one. When the bounded buffer is full, the
+    "block" policy waits up to overflow_timeout seconds for space and then drops
+    the write; the "drop" policy drops it immediately. Dropped writes are counted.
+    """
+    
+    def __init__(self, db: "ConversationDB", max_buffer: int = 10000, batch_size: int = 100,
+                 flush_interval_ms: float = 50, overflow: str = "block", overflow_timeout: float = 1.0):
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"Unknown write-behind overflow policy: {overflow}")
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.overflow = overflow
+        self.overflow_timeout = overflow_timeout
+        self._queue = queue.Queue(maxsize=max_buffer)
+        self._closed = threading.Event()
+        # Guards dropped, which request threads and the writer thread both increment
+        self._stats_lock = threading.Lock()
+        
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        
+        self._thread = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+        self._thread.start()
+    
+    def submit(self, operations: List[Tuple[str, tuple]]) -> bool:
+        """Queue statements that must commit together; False if the write was dropped"""
+        if self._closed.is_set():
+            return False
+        try:
+            if self.overflow == "block":
+                self._queue.put(operations, timeout=self.overflow_timeout)
+            else:
+                self._queue.put_nowait(operations)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+                dropped = self.dropped
+            print(f"Conversation write buffer full, dropped write ({dropped} total)")
+            return False
+    
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+    
+    def _collect(self) -> List[List[Tuple[str, tuple]]]:
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _write(self, batch: List[List[Tuple[str, tuple]]]):
+        conn = self.db._connection()
+        try:
+            with conn:
+                for operations in batch:
+                    for sql, params in operations:
+                        conn.execute(sql, params)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            # Retry one by one so a single bad row does not lose the whole batch
+            print(f"Error writing conversation batch, retrying individually: {e}")
+            for operations in batch:
+                try:
+                    with conn:
+                        for sql, params in operations:
+                            conn.execute(sql, params)
+                    self.written += 1
+                except Exception as row_error:
+                    with self._stats_lock:
+                        self.dropped += 1
+                    print(f"Error writing conversation: {row_error}")
+    
+    def _run(self):
+        while not (self._closed.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+    
+    def close(self, timeout: float = 30.0):
+        """Stop accepting writes and drain everything already queued"""
+        self._closed.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"Conversation writer did not drain in {timeout}s, {self.pending} writes pending")
+
+
 class ConversationDB:
-    def __init__(self, db_path: str = "conversations.db"):
+    def __init__(self, db_path: str = "conversations.db", cache_size_kb: int = 8192):
         self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self.writer = None
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self.init_database()
     
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's persistent connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, cached_statements=128,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA busy_timeout=10000')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def start_write_behind(self, **kwargs):
+        """Route session and conversation inserts through a background batched writer"""
+        if self.writer is None:
+            self.writer = WriteBehindQueue(self, **kwargs)
+    
+    def _write(self, operations: List[Tuple[str, tuple]]) -> bool:
+        """Run statements in one transaction, or queue them for the background writer"""
+        if self.writer:
+            return self.writer.submit(operations)
+        conn = self._connection()
+        with conn:
+            for sql, params in operations:
+                conn.execute(sql, params)
+        return True
+    
+    def close(self):
+        """Drain pending writes and close every pooled connection"""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+    
     def init_database(self):
-        """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Initialize the database and apply any pending schema migrations"""
+        conn = self._connection()
+        current = conn.execute('PRAGMA user_version').fetchone()[0]
         
-        # Create conversations table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS conversations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                user_message TEXT NOT NULL,
-                bot_response TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                context_chunks TEXT
-            )
-        ''')
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            # sqlite3 only opens transactions implicitly before DML, so DDL needs an
+            # explicit one; IMMEDIATE also serializes workers migrating at the same time
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                    conn.rollback()
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                # PRAGMA does not accept bound parameters
+                conn.execute(f'PRAGMA user_version = {int(version)}')
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            print(f"Applied database migration {version}: {description}")
         
-        # Create sessions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                last_activity DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
         print("Database initialized successfully")
     
+    def schema_version(self) -> int:
+        """Current schema version recorded in PRAGMA user_version"""
+        return self._connection().execute('PRAGMA user_version').fetchone()[0]
+    
     def create_session(self, session_id: str) -> bool:
         """Create a new conversation session"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO sessions (session_id, created_at, last_activity)
-                VALUES (?, ?, ?)
-            ''', (session_id, datetime.now(), datetime.now()))
-            
-            conn.commit()
-            conn.close()
-            return True
+            now = datetime.now()
+            return self._write([(INSERT_SESSION_SQL, (session_id, now, now))])
         except Exception as e:
             print(f"Error creating session: {e}")
             return False
@@ -61,25 +264,15 @@ class ConversationDB:
                         bot_response: str, context_chunks: List[str] = None) -> bool:
         """Add a conversation to the database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Convert context chunks to JSON string
             context_json = json.dumps(context_chunks) if context_chunks else None
             
-            cursor.execute('''
-                INSERT INTO conversations (session_id, user_message, bot_response, context_chunks)
-                VALUES (?, ?, ?, ?)
-            ''', (session_id, user_message, bot_response, context_json))
-            
-            # Update session last activity
-            cursor.execute('''
-                UPDATE sessions SET last_activity = ? WHERE session_id = ?
-            ''', (datetime.now(), session_id))
-            
-            conn.commit()
-            conn.close()
-            return True
+            # Timestamp is taken now, not when a background writer commits the row
+            return self._write([
+                (INSERT_CONVERSATION_SQL, (session_id, user_message, bot_response, utc_timestamp(), context_json)),
+                # Update session last activity
+                (UPDATE_ACTIVITY_SQL, (datetime.now(), session_id)),
+            ])
         except Exception as e:
             print(f"Error adding conversation: {e}")
             return False
@@ -87,19 +280,7 @@ class ConversationDB:
     def get_conversation_history(self, session_id: str, limit: int = 10) -> List[Dict]:
         """Get conversation history for a session"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT user_message, bot_response, timestamp, context_chunks
-                FROM conversations
-                WHERE session_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (session_id, limit))
-            
-            rows = cursor.fetchall()
-            conn.close()
+            rows = self._connection().execute(SELECT_HISTORY_SQL, (session_id, limit)).fetchall()
             
             history = []
             for row in rows:
@@ -130,14 +311,10 @@ class ConversationDB:
     def delete_session(self, session_id: str) -> bool:
         """Delete a conversation session and all its messages"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('DELETE FROM conversations WHERE session_id = ?', (session_id,))
-            cursor.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
-            
-            conn.commit()
-            conn.close()
+            conn = self._connection()
+            with conn:
+                conn.execute('DELETE FROM conversations WHERE session_id = ?', (session_id,))
+                conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
             return True
         except Exception as e:
             print(f"Error deleting session: {e}")
@@ -146,28 +323,25 @@ class ConversationDB:
     def cleanup_old_sessions(self, days: int = 30) -> int:
         """Clean up sessions older than specified days"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Delete old conversations
-            cursor.execute('''
-                DELETE FROM conversations 
-                WHERE session_id IN (
-                    SELECT session_id FROM sessions 
-                    WHERE last_activity < datetime('now', '-{} days')
-                )
-            '''.format(days))
-            
-            # Delete old sessions
-            cursor.execute('''
-                DELETE FROM sessions 
-                WHERE last_activity < datetime('now', '-{} days')
-            '''.format(days))
+            conn = self._connection()
+            cutoff = f'-{int(days)} days'
+            with conn:
+                # Delete old conversations
+                conn.execute('''
+                    DELETE FROM conversations 
+                    WHERE session_id IN (
+                        SELECT session_id FROM sessions 
+                        WHERE last_activity < datetime('now', ?)
+                    )
+                ''', (cutoff,))
+                
+                # Delete old sessions
+                cursor = conn.execute('''
+                    DELETE FROM sessions 
+                    WHERE last_activity < datetime('now', ?)
+                ''', (cutoff,))
             
             deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
-            
             return deleted_count
         except Exception as e:
             print(f"Error cleaning up old sessions: {e}")
@@ -0,0 +1,61 @@
+"""
+Registry of PDF documents to ingest
+Scans a directory of PDFs (brochures, policy wordings, ...) and attaches
+per-document metadata from an optional registry.json sidecar:
+
+    {
+        "iprotect-smart-brochure.pdf": {"product": "iProtect Smart", "uin": "105N151V06", "version": "6"},
+        ...
+    }
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+REGISTRY_FILE = "registry.json"
+
+
+class DocumentRegistry:
+    def __init__(self, documents_dir: str = "documents", extra_paths: Optional[List[str]] = None):
+        self.documents_dir = documents_dir
+        self.extra_paths = extra_paths or []
+
+    def _load_metadata(self) -> Dict[str, Dict]:
+        registry_path = os.path.join(self.documents_dir, REGISTRY_FILE)
+        if not os.path.exists(registry_path):
+            return {}
+        try:
+            with open(registry_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {registry_path}: {e}")
+            return {}
+
+    def documents(self) -> List[Dict]:
+        """All registered PDFs with their metadata, in a stable order"""
+        metadata = self._load_metadata()
+
+        paths = list(self.extra_paths)
+        if os.path.isdir(self.documents_dir):
+            for name in sorted(os.listdir(self.documents_dir)):
+                if name.lower().endswith('.pdf'):
+                    paths.append(os.path.join(self.documents_dir, name))
+
+        documents = []
+        seen = set()
+        for path in paths:
+            if path in seen or not os.path.exists(path):
+                continue
+            seen.add(path)
+
+            name = os.path.basename(path)
+            meta = metadata.get(name, {})
+            documents.append({
+                'doc_id': os.path.splitext(name)[0],
+                'path': path,
+                'title': meta.get('title', os.path.splitext(name)[0]),
+                'product': meta.get('product', ''),
+                'uin': meta.get('uin', ''),
+                'version': meta.get('version', ''),
+            })
+        return documents
@@ -0,0 +1,154 @@
+"""
+Sentence encoder backends
+"torch" loads the model with sentence-transformers. "onnx" runs an exported copy
+of the transformer with onnxruntime (optionally dynamically quantized to int8) and
+applies the same mean pooling and L2 normalization in numpy, so serving needs
+neither torch nor the PyTorch weights.
+
+Serving with "onnx" needs only requirements-serve.txt (onnxruntime, transformers for
+the tokenizer). Export once with the full requirements.txt, e.g. while building the image:
+    python -m encoders export --model all-MiniLM-L6-v2 --output models/all-MiniLM-L6-v2-onnx --quantize
+"""
+import argparse
+import inspect
+import json
+import os
+from typing import List
+import numpy as np
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model_int8.onnx"
+ENCODER_CONFIG_FILE = "encoder_config.json"
+
+
+class ONNXEncoder:
+    """
+    Drop-in for the parts of SentenceTransformer the chatbot uses:
+    encode(), tokenizer, max_seq_length and get_sentence_embedding_dimension()
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False, intra_op_threads: int = 0):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_file = ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        model_path = os.path.join(model_dir, model_file)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"No exported model at {model_path}; run `python -m encoders export`")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        with open(os.path.join(model_dir, ENCODER_CONFIG_FILE), 'r', encoding='utf-8') as f:
+            self.max_seq_length = json.load(f)["max_seq_length"]
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Mean-pooled, L2-normalized embeddings; a single string returns a single vector"""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        # Length-sorted batches waste less work on padding
+        order = np.argsort([-len(sentence) for sentence in sentences], kind='stable')
+        embeddings = np.empty((len(sentences), self.dimension), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([sentences[row] for row in rows])
+
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, sentences: List[str]) -> np.ndarray:
+        encoded = self.tokenizer(sentences, padding=True, truncation=True,
+                                 max_length=self.max_seq_length, return_tensors="np")
+        inputs = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = False, opset: int = 14):
+    """Export the model's transformer to ONNX (and optionally an int8 copy) with its tokenizer"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, ENCODER_CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump({"model_name": model_name, "max_seq_length": model.max_seq_length}, f)
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # Newer torch defaults to the dynamo exporter, which ignores dynamic_axes
+        export_kwargs["dynamo"] = False
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(sample[name] for name in input_names), model_path,
+            input_names=input_names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes, opset_version=opset, **export_kwargs
+        )
+    print(f"Exported {model_name} to {model_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        int8_path = os.path.join(output_dir, ONNX_INT8_MODEL_FILE)
+        quantize_dynamic(model_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"Wrote dynamically quantized int8 model to {int8_path}")
+
+
+def load_encoder(model_name: str, backend: str = "torch", onnx_dir: str = "", quantized: bool = False):
+    """Create the sentence encoder for the configured backend ("torch" or "onnx")"""
+    backend = backend.lower()
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    if backend == "onnx":
+        return ONNXEncoder(onnx_dir or os.path.join("models", f"{model_name}-onnx"), quantized=quantized)
+    raise ValueError(f"Unknown encoder backend: {backend}")
+
+
+def encoder_id(model_name: str, backend: str = "torch", quantized: bool = False) -> str:
+    """
+    Identity of the embedding space, recorded in the index manifest. Quantized
+    ONNX vectors differ slightly from torch's, so they get their own index.
+    """
+    if backend.lower() == "onnx" and quantized:
+        return f"{model_name}:onnx-int8"
+    return model_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder backend tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Export a sentence-transformers model to ONNX")
+    export.add_argument("--model", default="all-MiniLM-L6-v2")
+    export.add_argument("--output", required=True)
+    export.add_argument("--quantize", action="store_true", help="also write a dynamically quantized int8 model")
+    export.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.model, args.output, quantize=args.quantize, opset=args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Streaming HTML text extraction with lxml
+A parser target receives start/end/data events straight from libxml2, so no
+document tree is built: boilerplate (script, style, nav, header, footer) is
+skipped as it streams past and only the text of the main content region is kept
+"""
+import re
+from typing import Dict, List
+from lxml import etree
+
+SKIP_TAGS = {'script', 'style', 'nav', 'footer', 'header'}
+CONTENT_CLASS = re.compile('content|main')
+
+# Region priority matches the BeautifulSoup path: <main>, then <article>,
+# then a div whose class mentions content/main, then the whole document
+REGIONS = ('main', 'article', 'content_div', 'document')
+
+
+class _ExtractionTarget:
+    """lxml parser target that collects title, description, links and region text"""
+
+    def __init__(self):
+        self.depth = 0
+        self.skip_depth = 0
+        self.in_title = False
+        self.title_parts = []
+        self.description = ""
+        self.hrefs = []
+        self.region_parts = {region: [] for region in REGIONS}
+        # region -> element depth while it is open; closed regions are never reopened
+        self.open_regions = {'document': 0}
+        self.closed_regions = set()
+
+    def _region_for(self, tag: str, attrib) -> str:
+        if tag == 'main':
+            return 'main'
+        if tag == 'article':
+            return 'article'
+        if tag == 'div' and CONTENT_CLASS.search(attrib.get('class', '')):
+            return 'content_div'
+        return None
+
+    def start(self, tag, attrib):
+        self.depth += 1
+        if not isinstance(tag, str):
+            return
+        tag = tag.lower()
+
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == 'title':
+            self.in_title = True
+        elif tag == 'a' and attrib.get('href'):
+            self.hrefs.append(attrib['href'])
+        elif tag == 'meta' and attrib.get('name', '').lower() == 'description' and not self.description:
+            self.description = attrib.get('content', '')
+
+        region = self._region_for(tag, attrib)
+        if region and region not in self.open_regions and region not in self.closed_regions:
+            self.open_regions[region] = self.depth
+
+    def end(self, tag):
+        if isinstance(tag, str):
+            tag = tag.lower()
+            if tag in SKIP_TAGS:
+                self.skip_depth = max(0, self.skip_depth - 1)
+            elif tag == 'title':
+                self.in_title = False
+
+        for region, depth in list(self.open_regions.items()):
+            if depth == self.depth and region != 'document':
+                del self.open_regions[region]
+                self.closed_regions.add(region)
+        self.depth -= 1
+
+    def data(self, text):
+        if self.in_title:
+            self.title_parts.append(text)
+        if self.skip_depth:
+            return
+        for region in self.open_regions:
+            self.region_parts[region].append(text)
+
+    def close(self) -> Dict:
+        # The document region is always open, so this always finds a region
+        for region in REGIONS:
+            if region in self.closed_regions or region in self.open_regions:
+                break
+        return {
+            'title': ''.join(self.title_parts),
+            'description': self.description,
+            'text': _join_text(self.region_parts[region]),
+            'hrefs': self.hrefs,
+        }
+
+
+def _join_text(parts: List[str]) -> str:
+    """Join text nodes like BeautifulSoup's get_text(separator=' ', strip=True)"""
+    return ' '.join(piece for piece in (part.strip() for part in parts) if piece)
+
+
+def extract_with_lxml(html: bytes, chunk_size: int = 64 * 1024) -> Dict:
+    """
+    Extract title, meta description, main-content text and raw link hrefs from HTML.
+    The document is fed to the parser in chunks, so memory stays proportional to the
+    extracted text rather than the parsed tree.
+    """
+    target = _ExtractionTarget()
+    if not html:
+        return target.close()
+    parser = etree.HTMLParser(target=target, remove_comments=True, recover=True)
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+    return parser.close()
@@ -0,0 +1,81 @@
+"""
+On-disk HTTP cache for conditional page fetches
+Stores the raw body, the ETag/Last-Modified validators and the parsed page
+for each URL, so an unchanged page (304 Not Modified) needs no download or parsing
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional
+
+
+class HTTPCache:
+    def __init__(self, cache_dir: str = "http_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for a URL (metadata plus 'body' bytes), or None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['body'] = f.read()
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Request headers that let the server answer 304 if the page is unchanged"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, body: bytes, headers, page: Optional[Dict] = None, parser_version: int = 0):
+        """Store a fresh response with its validators and parsed page"""
+        meta_path, body_path = self._paths(url)
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+            'parser_version': parser_version,
+            'page': page,
+        }
+        try:
+            self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(entry).encode('utf-8'))
+        except OSError as e:
+            print(f"Error writing HTTP cache for {url}: {e}")
+
+    def touch(self, url: str, entry: Dict, page: Optional[Dict] = None, parser_version: int = 0):
+        """Record a successful revalidation (and a re-parsed page, if any)"""
+        body = entry.pop('body', b'')
+        if page is not None:
+            entry['page'] = page
+            entry['parser_version'] = parser_version
+        entry['fetched_at'] = time.time()
+        meta_path, _ = self._paths(url)
+        try:
+            self._write_atomic(meta_path, json.dumps(entry).encode('utf-8'))
+        except OSError as e:
+            print(f"Error writing HTTP cache for {url}: {e}")
+        entry['body'] = body
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
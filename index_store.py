@@ -0,0 +1,316 @@
+"""
+Versioned on-disk format for the chunk index
+
+Layout of an index directory:
+    CURRENT         - name of the committed generation directory
+    gen-*/          - one directory per saved index generation, holding:
+    manifest.json   - format version, model name, dimension, counts, content, source and chunking hashes
+    embeddings.npy  - (n_chunks, dim) float32 matrix, loaded with mmap_mode='r'
+    offsets.npy     - (n_chunks + 1,) int64 byte offsets into chunks.bin
+    chunks.bin      - UTF-8 chunk text, concatenated
+    chunk_meta.json - per-chunk content hashes and the source table for incremental rebuilds
+    columns.npz     - per-chunk metadata arrays (source type, source id, page number)
+    faq_embeddings.npy, faq_meta.json - embedded FAQ questions, keyed by a hash of model and texts
+                      (next to CURRENT, not inside a generation)
+
+Every save writes a complete new generation and then atomically replaces CURRENT,
+so a reader that resolves CURRENT once always sees one consistent set of files,
+however many workers are saving at the same time. Indexes written before
+generations existed (files directly in the index directory) still load.
+
+Workers memory-map the arrays, so several processes share one copy of the
+index through the OS page cache instead of unpickling private copies.
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+FORMAT_VERSION = 2
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+OFFSETS_FILE = "offsets.npy"
+CHUNKS_FILE = "chunks.bin"
+CHUNK_META_FILE = "chunk_meta.json"
+COLUMNS_FILE = "columns.npz"
+FAQ_EMBEDDINGS_FILE = "faq_embeddings.npy"
+FAQ_META_FILE = "faq_meta.json"
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+# Uncommitted generations younger than this may still be in progress in another worker
+STALE_GENERATION_SECONDS = 3600
+
+
+class IndexFormatError(Exception):
+    """Raised when an index directory is missing, incomplete or incompatible"""
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Hex SHA-256 of a byte string"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    """Hex SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ChunkTexts(Sequence):
+    """Read-only list of chunk strings backed by a memory-mapped UTF-8 blob"""
+
+    def __init__(self, blob, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("chunk index out of range")
+        start, end = int(self._offsets[idx]), int(self._offsets[idx + 1])
+        return self._blob[start:end].decode('utf-8')
+
+
+def _write_atomic(path: str, write_fn):
+    """Write a file via a temp name and os.replace so readers never see partial data"""
+    # Per-writer temp name, so concurrent builders never interleave writes to one file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            write_fn(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def chunk_hash(chunk: str) -> str:
+    """Content hash identifying a chunk's text (and therefore its embedding)"""
+    return sha256_bytes(chunk.encode('utf-8'))
+
+
+def save_index(index_dir: str, embeddings: np.ndarray, chunks: Sequence,
+               model_name: str, sources: Optional[Dict[str, str]] = None,
+               columns: Optional[Dict[str, np.ndarray]] = None,
+               source_table: Optional[List[str]] = None,
+               documents: Optional[Dict[str, Dict]] = None,
+               chunking: Optional[str] = None) -> Dict:
+    """
+    Save embeddings and chunk text as a new generation and return the manifest.
+    Switching CURRENT to the finished generation is the commit.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if embeddings.ndim != 2 or len(embeddings) != len(chunks):
+        raise ValueError("embeddings must be a 2-D matrix with one row per chunk")
+
+    os.makedirs(index_dir, exist_ok=True)
+    previous = _read_current(index_dir)
+    generation = tempfile.mkdtemp(prefix=GENERATION_PREFIX, dir=index_dir)
+
+    encoded = [chunk.encode('utf-8') for chunk in chunks]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+
+    # Content version: changes whenever chunk text or embeddings change
+    content_digest = hashlib.sha256(model_name.encode('utf-8'))
+    for chunk in encoded:
+        content_digest.update(chunk)
+        content_digest.update(b'\0')
+    content_digest.update(memoryview(embeddings).cast('B'))
+
+    _write_atomic(os.path.join(generation, EMBEDDINGS_FILE), lambda f: np.save(f, embeddings))
+    _write_atomic(os.path.join(generation, OFFSETS_FILE), lambda f: np.save(f, offsets))
+    _write_atomic(os.path.join(generation, CHUNKS_FILE), lambda f: f.writelines(encoded))
+
+    chunk_meta = {
+        "hashes": [sha256_bytes(chunk) for chunk in encoded],
+        "source_table": list(source_table or []),
+    }
+    _write_atomic(os.path.join(generation, CHUNK_META_FILE),
+                  lambda f: f.write(json.dumps(chunk_meta).encode('utf-8')))
+    if columns:
+        _write_atomic(os.path.join(generation, COLUMNS_FILE), lambda f: np.savez(f, **columns))
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_name": model_name,
+        "dimension": int(embeddings.shape[1]),
+        "count": len(chunks),
+        "dtype": "float32",
+        "content_hash": content_digest.hexdigest(),
+        "created_at": datetime.now().isoformat(),
+        "sources": sources or {},
+        "documents": documents or {},
+        "chunking": chunking or "",
+    }
+    _write_atomic(os.path.join(generation, MANIFEST_FILE),
+                  lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+
+    name = os.path.basename(generation)
+    _write_atomic(os.path.join(index_dir, CURRENT_FILE), lambda f: f.write(name.encode('utf-8')))
+    _prune_generations(index_dir, keep={name, previous})
+    return manifest
+
+
+def _read_current(index_dir: str) -> Optional[str]:
+    """Name of the committed generation, or None for an empty or pre-generation index"""
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def current_generation(index_dir: str) -> str:
+    """
+    Directory holding the committed index files. Resolve it once per load and
+    read every file from it, so a concurrent save cannot mix two generations.
+    """
+    name = _read_current(index_dir)
+    return os.path.join(index_dir, name) if name else index_dir
+
+
+def _prune_generations(index_dir: str, keep: set):
+    """
+    Remove superseded generations. The previous one is kept for workers that
+    resolved CURRENT just before the switch, and recent uncommitted ones may
+    belong to a save still running elsewhere. Files still memory-mapped on
+    platforms that refuse deletion are left for the next save.
+    """
+    now = time.time()
+    for name in os.listdir(index_dir):
+        path = os.path.join(index_dir, name)
+        if name in keep or not name.startswith(GENERATION_PREFIX) or not os.path.isdir(path):
+            continue
+        committed = os.path.exists(os.path.join(path, MANIFEST_FILE))
+        if committed or now - os.path.getmtime(path) > STALE_GENERATION_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
+
+    # Files of the pre-generation layout are superseded by the first generation
+    for name in (MANIFEST_FILE, EMBEDDINGS_FILE, OFFSETS_FILE, CHUNKS_FILE, CHUNK_META_FILE, COLUMNS_FILE):
+        try:
+            os.remove(os.path.join(index_dir, name))
+        except OSError:
+            pass
+
+
+def read_manifest(index_dir: str) -> Dict:
+    """Read and version-check the manifest of an index directory"""
+    manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise IndexFormatError(f"No index manifest at {manifest_path}")
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise IndexFormatError(
+            f"Unsupported index format version {manifest.get('format_version')} "
+            f"(expected {FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def load_chunk_meta(index_dir: str, chunks: Sequence) -> Dict[str, List[str]]:
+    """Per-chunk hashes and the source table; hashes are recomputed from the text if the file is missing"""
+    meta_path = os.path.join(index_dir, CHUNK_META_FILE)
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if len(meta.get("hashes", [])) == len(chunks):
+            return meta
+    return {"hashes": [chunk_hash(chunk) for chunk in chunks], "source_table": []}
+
+
+def load_columns(index_dir: str, count: int) -> Dict[str, np.ndarray]:
+    """Per-chunk metadata arrays saved with the index (empty if there are none)"""
+    columns_path = os.path.join(index_dir, COLUMNS_FILE)
+    if not os.path.exists(columns_path):
+        return {}
+    with np.load(columns_path) as data:
+        columns = {name: data[name] for name in data.files}
+    for name, column in columns.items():
+        if len(column) != count:
+            raise IndexFormatError(f"Column {name} has {len(column)} rows, expected {count}")
+    return columns
+
+
+def save_faq_embeddings(index_dir: str, embeddings: np.ndarray, content_hash: str):
+    """Cache embedded FAQ questions next to the chunk index"""
+    os.makedirs(index_dir, exist_ok=True)
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    _write_atomic(os.path.join(index_dir, FAQ_EMBEDDINGS_FILE), lambda f: np.save(f, embeddings))
+    _write_atomic(os.path.join(index_dir, FAQ_META_FILE),
+                  lambda f: f.write(json.dumps({"content_hash": content_hash}).encode('utf-8')))
+
+
+def load_faq_embeddings(index_dir: str, content_hash: str) -> Optional[np.ndarray]:
+    """Cached FAQ embeddings, or None if missing or built from other questions or another model"""
+    try:
+        with open(os.path.join(index_dir, FAQ_META_FILE), 'r', encoding='utf-8') as f:
+            if json.load(f).get("content_hash") != content_hash:
+                return None
+        return np.load(os.path.join(index_dir, FAQ_EMBEDDINGS_FILE))
+    except (OSError, ValueError):
+        return None
+
+
+def index_exists(index_dir: str) -> bool:
+    """Check whether an index directory has a committed generation"""
+    return os.path.exists(os.path.join(current_generation(index_dir), MANIFEST_FILE))
+
+
+def load_index(index_dir: str, model_name: Optional[str] = None) -> Tuple[np.ndarray, ChunkTexts, Dict]:
+    """
+    Memory-map an index directory (or one generation of it) and return
+    (embeddings, chunks, manifest).
+    Raises IndexFormatError if the files are inconsistent or built for another model.
+    """
+    index_dir = current_generation(index_dir)
+    manifest = read_manifest(index_dir)
+
+    if model_name and manifest.get("model_name") != model_name:
+        raise IndexFormatError(
+            f"Index was built with {manifest.get('model_name')}, not {model_name}"
+        )
+
+    embeddings = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode='r')
+    offsets = np.load(os.path.join(index_dir, OFFSETS_FILE), mmap_mode='r')
+
+    if embeddings.shape != (manifest["count"], manifest["dimension"]):
+        raise IndexFormatError(f"Embedding matrix shape {embeddings.shape} does not match manifest")
+    if len(offsets) != manifest["count"] + 1:
+        raise IndexFormatError("Chunk offsets do not match manifest")
+
+    chunks_path = os.path.join(index_dir, CHUNKS_FILE)
+    if os.path.getsize(chunks_path) != int(offsets[-1]):
+        raise IndexFormatError("Chunk text blob does not match offsets")
+
+    if int(offsets[-1]) == 0:
+        blob = b''
+    else:
+        with open(chunks_path, 'rb') as f:
+            blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return embeddings, ChunkTexts(blob, offsets), manifest
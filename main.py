@@ -7,6 +7,8 @@ import uuid
 import uvicorn
 import os
 from chatbot import ICICIInsuranceChatbot
+from config import settings
+from request_executor import BoundedExecutor, ExecutorOverloaded
 
 # Initialize FastAPI app
 app = FastAPI(title="ICICI Insurance Chatbot", version="1.0.0")
@@ -21,6 +23,9 @@ templates = Jinja2Templates(directory="templates")
 # Initialize chatbot
 chatbot = None
 
+# Blocking chat work runs here so the event loop keeps serving other requests
+executor = BoundedExecutor(max_workers=settings.chat_workers, max_queue=settings.chat_max_queue)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize chatbot on startup"""
@@ -39,6 +44,8 @@ async def startup_event():
 class ChatRequest(BaseModel):
     message: str
     session_id: str = None
+    document: str = None
+    product: str = None
 
 class ChatResponse(BaseModel):
     response: str
@@ -61,8 +68,9 @@ async def chat_endpoint(chat_request: ChatRequest):
         # Generate session ID if not provided
         session_id = chat_request.session_id or str(uuid.uuid4())
         
-        # Get response from chatbot
-        result = chatbot.chat(chat_request.message, session_id)
+        # Get response from chatbot off the event loop
+        result = await executor.run(chatbot.chat, chat_request.message, session_id,
+                                    chat_request.document, chat_request.product)
         
         return ChatResponse(
             response=result["response"],
@@ -71,6 +79,12 @@ async def chat_endpoint(chat_request: ChatRequest):
             relevant_chunks=result["relevant_chunks"]
         )
     
+    except ExecutorOverloaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
@@ -81,8 +95,14 @@ async def get_history(session_id: str):
         raise HTTPException(status_code=500, detail="Chatbot not initialized")
     
     try:
-        history = chatbot.get_conversation_history(session_id)
+        history = await executor.run(chatbot.get_conversation_history, session_id)
         return {"history": history, "session_id": session_id}
+    except ExecutorOverloaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting history: {str(e)}")
 
@@ -93,13 +113,19 @@ async def health_check():
     return {
         "status": "healthy" if is_ready else "degraded",
         "chatbot_ready": is_ready,
-        "chunks_loaded": len(chatbot.chunks) if is_ready and hasattr(chatbot, 'chunks') else 0
+        "chunks_loaded": len(chatbot.store) if is_ready and hasattr(chatbot, 'store') else 0,
+        "pending_requests": executor.pending,
+        "rejected_requests": executor.rejected,
+        "caches": chatbot.cache_stats() if is_ready else None,
+        "pending_writes": chatbot.db.writer.pending if is_ready and chatbot.db.writer else 0
     }
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Cleanup on shutdown"""
+    """Cleanup on shutdown (in-flight requests finish, then queued conversation writes drain)"""
+    executor.shutdown(wait=True)
     if chatbot:
+        chatbot.close()
         chatbot.cleanup_files()
         print("Cleanup completed")
 
@@ -1,26 +1,66 @@
+import multiprocessing
 import PyPDF2
 import re
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
 import os
+from chunker import SentenceChunker
+
+def extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """Extract text for pages [start, end) - runs in worker processes"""
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [(page_num, pdf_reader.pages[page_num].extract_text() or "")
+                for page_num in range(start, min(end, len(pdf_reader.pages)))]
 
 class PDFProcessor:
-    def __init__(self, pdf_path: str, max_chunks: int = 200):
+    def __init__(self, pdf_path: str, max_chunks: int = 200, workers: int = 1,
+                 pages_per_task: int = 16, min_pages_for_pool: int = 32,
+                 chunker: Optional[SentenceChunker] = None):
         self.pdf_path = pdf_path
         self.max_chunks = max_chunks
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.min_pages_for_pool = min_pages_for_pool
+        self.chunker = chunker or SentenceChunker()
         self.chunks = []
+        self.chunk_pages = []
+    
+    def iter_pages(self) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) in page order. Large PDFs are extracted by a
+        process pool in page ranges, with a bounded number of ranges in flight so
+        memory stays flat however long the document is.
+        """
+        with open(self.pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            page_count = len(pdf_reader.pages)
+            
+            if self.workers <= 1 or page_count < self.min_pages_for_pool:
+                for page_num in range(page_count):
+                    yield page_num, pdf_reader.pages[page_num].extract_text() or ""
+                return
+        
+        ranges = deque(range(0, page_count, self.pages_per_task))
+        # Spawned, not forked: by now the batcher, write-behind and torch threads are
+        # running, and forking a multithreaded process can deadlock the child
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            in_flight = deque()
+            while ranges or in_flight:
+                while ranges and len(in_flight) < self.workers * 2:
+                    start = ranges.popleft()
+                    in_flight.append(pool.submit(extract_page_range, self.pdf_path, start,
+                                                 start + self.pages_per_task))
+                # Ranges complete out of order, but are consumed in order
+                for page in in_flight.popleft().result():
+                    yield page
     
     def extract_text_from_pdf(self) -> str:
         """Extract text from PDF file"""
         try:
-            with open(self.pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
-                
-                return text
+            return "".join(text + "\n" for _, text in self.iter_pages())
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return ""
@@ -35,37 +75,39 @@ class PDFProcessor:
         text = re.sub(r'([.,!?;:])\1+', r'\1', text)
         return text.strip()
     
-    def create_chunks(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
-        """Split text into overlapping chunks"""
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if len(chunk.strip()) > 0:
-                chunks.append(chunk.strip())
-            
-            # Limit to max_chunks
-            if len(chunks) >= self.max_chunks:
-                break
-        
-        return chunks
+    def iter_chunks(self, texts: Iterator[str]) -> Iterator[str]:
+        """
+        Stream sentence-aware, token-budgeted chunks from a sequence of text pieces,
+        stopping after max_chunks. The index of the piece (page) each chunk starts
+        in is recorded in self.chunk_pages.
+        """
+        self.chunk_pages = []
+        if self.max_chunks <= 0:
+            return
+        for piece, chunk in self.chunker.iter_chunks(texts):
+            self.chunk_pages.append(piece)
+            yield chunk
+            if len(self.chunk_pages) >= self.max_chunks:
+                return
+    
+    def create_chunks(self, text: str) -> List[str]:
+        """Split text into sentence-aware chunks"""
+        return list(self.iter_chunks([text]))
     
     def process_pdf(self) -> List[str]:
         """Main method to process PDF and return chunks"""
         print(f"Processing PDF: {self.pdf_path}")
         
-        # Extract text
-        raw_text = self.extract_text_from_pdf()
-        if not raw_text:
+        # Stream pages through extract -> clean -> chunk; extraction stops once max_chunks is reached
+        try:
+            cleaned_pages = (self.clean_text(text) for _, text in self.iter_pages())
+            self.chunks = list(self.iter_chunks(cleaned_pages))
+            # 1-based page each chunk starts on (pages are yielded in order from page 0)
+            self.chunk_pages = [page + 1 for page in self.chunk_pages]
+        except Exception as e:
+            print(f"Error extracting text from PDF: {e}")
             return []
         
-        # Clean text
-        cleaned_text = self.clean_text(raw_text)
-        
-        # Create chunks
-        self.chunks = self.create_chunks(cleaned_text)
-        
         print(f"Created {len(self.chunks)} chunks from PDF")
         return self.chunks
     
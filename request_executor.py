@@ -0,0 +1,58 @@
+"""
+Bounded thread pool for running blocking chat work off the asyncio event loop
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class ExecutorOverloaded(Exception):
+    """Raised when the executor already holds its maximum number of requests"""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a hard cap on in-flight work (running + queued).
+    Submissions beyond the cap fail immediately instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, thread_name_prefix: str = "chat-worker"):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Submit work or raise ExecutorOverloaded if the pool is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorOverloaded(f"{self.max_pending} requests already in flight")
+
+        with self._lock:
+            self.pending += 1
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run blocking work in the pool and await its result from the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,72 @@
+"""
+Semantic FAQ tier
+FAQ key phrases and their paraphrased questions are embedded once with the chat
+model and cached next to the chunk index. A query embedding is compared against
+this small matrix before chunk retrieval, so paraphrased FAQ questions are answered
+without running retrieval and sentence scoring.
+"""
+import hashlib
+import threading
+from typing import Callable, Dict, Optional
+import numpy as np
+from faq import FAQMatcher
+from index_store import load_faq_embeddings, save_faq_embeddings
+from vector_index import normalize_embeddings
+
+
+class SemanticFAQ:
+    """Cosine nearest-neighbour match of query embeddings against embedded FAQ questions"""
+
+    def __init__(self, matcher: FAQMatcher, threshold: float = 0.75):
+        self.matcher = matcher
+        self.threshold = threshold
+        self.question_ids = np.asarray(matcher.question_ids, dtype=np.int32)
+        self.embeddings = None
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def content_hash(self, model_name: str) -> str:
+        """Identifies the model and question texts the cached embeddings were built from"""
+        digest = hashlib.sha256(model_name.encode('utf-8'))
+        for question in self.matcher.questions:
+            digest.update(b'\0')
+            digest.update(question.encode('utf-8'))
+        return digest.hexdigest()
+
+    def build(self, encode_fn: Callable, model_name: str, index_dir: Optional[str] = None):
+        """Load cached question embeddings, or encode and cache them"""
+        content_hash = self.content_hash(model_name)
+        embeddings = load_faq_embeddings(index_dir, content_hash) if index_dir else None
+        if embeddings is None or len(embeddings) != len(self.question_ids):
+            embeddings = encode_fn(self.matcher.questions)
+            if index_dir:
+                save_faq_embeddings(index_dir, embeddings, content_hash)
+        self.embeddings = normalize_embeddings(embeddings)
+
+    def match(self, query_embedding: np.ndarray) -> Optional[int]:
+        """Index of the closest FAQ if its similarity clears the threshold, else None"""
+        query = normalize_embeddings(query_embedding)[0]
+        scores = self.embeddings @ query
+        best = int(np.argmax(scores))
+        hit = scores[best] >= self.threshold
+
+        with self._lock:
+            self.lookups += 1
+            self.hits += int(hit)
+        return int(self.question_ids[best]) if hit else None
+
+    def answer(self, query_embedding: np.ndarray) -> Optional[str]:
+        faq_id = self.match(query_embedding)
+        return self.matcher.answers[faq_id] if faq_id is not None else None
+
+    def stats(self) -> Dict:
+        """Lookup and hit counters for tuning the threshold"""
+        with self._lock:
+            return {
+                "questions": len(self.question_ids),
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            }
@@ -0,0 +1,96 @@
+"""
+Sentence-level index over chunk text for extractive answers
+Each chunk is split into sentences once, when the index is built. Every sentence
+keeps its folded token set and the filter/bonus flags used by answer scoring,
+so scoring a query is set intersections over cached data instead of re-splitting
+and substring-scanning the retrieved chunks on every request.
+"""
+import re
+from typing import FrozenSet, Iterable, List, NamedTuple, Sequence
+
+STOP_WORDS = frozenset({'what', 'is', 'are', 'the', 'how', 'can', 'do', 'does', 'tell', 'me', 'about',
+                        'a', 'an', 'and', 'or', 'in', 'on', 'for', 'to', 'of', 'with'})
+DOMAIN_TERMS = ('benefit', 'cover', 'premium', 'claim', 'policy', 'insurance')
+ANSWER_PHRASES = ('you can', 'offers', 'provides', 'includes', 'available')
+
+# Source prefixes like "From Life Insurance - ICICI Prudential...:" and trailing source notes
+_SOURCE_PREFIX = re.compile(r'From [^:]+:\s*')
+_SOURCE_NOTE = re.compile(r'Source: [^.]+\.')
+_TOKEN = re.compile(r'\w+')
+
+
+class IndexedSentence(NamedTuple):
+    text: str
+    tokens: FrozenSet[str]
+    # Passes the length and jargon (UIN/WII) filters
+    eligible: bool
+    has_domain_term: bool
+    has_answer_phrase: bool
+
+
+def singular(word: str) -> str:
+    """Fold a simple plural ('claims' -> 'claim'); words ending in 'ss' are left alone"""
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def words(text: str) -> List[str]:
+    """Lowercase word tokens"""
+    return _TOKEN.findall(text.lower())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with simple plurals folded"""
+    return [singular(word) for word in words(text)]
+
+
+def content_tokens(text: str) -> List[str]:
+    """Folded word tokens without stop words"""
+    return [singular(word) for word in words(text) if word not in STOP_WORDS]
+
+
+def query_keywords(query: str) -> FrozenSet[str]:
+    """
+    Folded content words of a query (no stop words, longer than 2 characters).
+    Sentences hold folded tokens too, so 'claims' and 'claim' match once either way.
+    """
+    return frozenset(singular(word) for word in words(query)
+                     if word not in STOP_WORDS and len(word) > 2)
+
+
+def index_sentences(chunk: str) -> List[IndexedSentence]:
+    """Clean a chunk, split it into sentences and precompute each sentence's features"""
+    text = _SOURCE_PREFIX.sub('', chunk)
+    text = _SOURCE_NOTE.sub('', text)
+
+    sentences = []
+    for sentence in (s.strip() for s in text.split('.')):
+        if not sentence:
+            continue
+        lower = sentence.lower()
+        sentences.append(IndexedSentence(
+            text=sentence,
+            tokens=frozenset(tokenize(lower)),
+            eligible=(20 <= len(sentence) <= 500 and 'UIN:' not in sentence and 'WII' not in sentence),
+            has_domain_term=any(term in lower for term in DOMAIN_TERMS),
+            has_answer_phrase=any(phrase in lower for phrase in ANSWER_PHRASES),
+        ))
+    return sentences
+
+
+class SentenceIndex:
+    """Per-chunk lists of indexed sentences, addressed by chunk id"""
+
+    def __init__(self, chunks: Sequence[str] = ()):
+        self.chunk_sentences = [index_sentences(chunk) for chunk in chunks]
+
+    def __len__(self) -> int:
+        return len(self.chunk_sentences)
+
+    def sentences_for(self, chunk_ids: Iterable[int]) -> List[IndexedSentence]:
+        """Sentences of the given chunks, concatenated in chunk order"""
+        sentences = []
+        for chunk_id in chunk_ids:
+            sentences.extend(self.chunk_sentences[chunk_id])
+        return sentences
@@ -0,0 +1,251 @@
+"""
+Vector index backends for chunk retrieval
+Provides an exact brute-force index, an approximate IVF index and int8 / binary
+quantized indexes that scan compact codes and re-rank at full precision
+"""
+import numpy as np
+from typing import List, Tuple
+
+
+def normalize_embeddings(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize rows into a contiguous float32 matrix. Input that is already
+    normalized float32 is returned as-is so the corpus is never copied twice
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    if np.allclose(norms, 1.0, atol=1e-4):
+        return vectors
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest scores, best first, without a full sort"""
+    if top_k >= len(scores):
+        return np.argsort(scores)[::-1]
+    candidates = np.argpartition(scores, -top_k)[-top_k:]
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+class VectorIndex:
+    """Base class for vector indexes over the chunk embedding matrix"""
+
+    def build(self, embeddings: np.ndarray):
+        """Build the index from an (n_chunks, dim) embedding matrix"""
+        raise NotImplementedError
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (indices, scores) of the top_k most similar chunks, best first"""
+        raise NotImplementedError
+
+    def search_ranges(self, query_embedding: np.ndarray, ranges: List[Tuple[int, int]],
+                      top_k: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact search restricted to the given (start, end) row ranges, e.g. one document's
+        chunks. Only those slices of the corpus are scored; indices are global row numbers
+        """
+        if not ranges:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = normalize_embeddings(query_embedding)[0]
+        rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+        scores = np.concatenate([self.vectors[start:end] @ query for start, end in ranges])
+        order = top_k_indices(scores, top_k)
+        return rows[order], scores[order]
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class ExactIndex(VectorIndex):
+    """
+    Brute-force cosine similarity over every chunk. The corpus is normalized
+    once at build time so each query is a single matrix-vector product
+    """
+
+    def __init__(self):
+        self.vectors = None
+
+    def build(self, embeddings: np.ndarray):
+        self.vectors = normalize_embeddings(embeddings)
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize_embeddings(query_embedding)[0]
+        similarities = self.vectors @ query
+        top_indices = top_k_indices(similarities, top_k)
+        return top_indices, similarities[top_indices]
+
+    def __len__(self) -> int:
+        return 0 if self.vectors is None else len(self.vectors)
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted file index: k-means partitions the corpus into nlist cells and
+    each query only scores the chunks in its nprobe closest cells
+    """
+
+    def __init__(self, nlist: int = 64, nprobe: int = 8, n_iter: int = 20, seed: int = 42):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self.vectors = None
+        self.lists = []
+
+    def _train(self, vectors: np.ndarray) -> np.ndarray:
+        """Spherical k-means on normalized vectors"""
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist, len(vectors))
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = vectors[assignments == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+                else:
+                    # Re-seed empty cells so every list stays useful
+                    centroids[c] = vectors[rng.integers(len(vectors))]
+            centroids = normalize_embeddings(centroids)
+
+        return centroids
+
+    def build(self, embeddings: np.ndarray):
+        self.vectors = normalize_embeddings(embeddings)
+        self.centroids = self._train(self.vectors)
+
+        assignments = np.argmax(self.vectors @ self.centroids.T, axis=1)
+        self.lists = [np.flatnonzero(assignments == c) for c in range(len(self.centroids))]
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize_embeddings(query_embedding)[0]
+
+        # Pick the closest cells, then score only their members
+        nprobe = min(self.nprobe, len(self.centroids))
+        cell_scores = self.centroids @ query
+        probe_cells = top_k_indices(cell_scores, nprobe)
+        candidates = np.concatenate([self.lists[c] for c in probe_cells])
+
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self.vectors[candidates] @ query
+        order = top_k_indices(scores, top_k)
+        return candidates[order], scores[order]
+
+    def __len__(self) -> int:
+        return 0 if self.vectors is None else len(self.vectors)
+
+
+# Set bits per byte value, for Hamming distances over packed sign bits
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class QuantizedIndex(VectorIndex):
+    """
+    Scans compact codes for a first pass, then rescores the best `rerank`
+    candidates against the full-precision vectors (rerank=0 returns the
+    approximate scores). When the float matrix is memory-mapped from the index
+    directory, only the rescored rows are read; the scan touches just the codes.
+    """
+
+    def __init__(self, rerank: int = 200):
+        self.rerank = rerank
+        self.vectors = None
+        self.codes = None
+
+    def _encode(self, vectors: np.ndarray):
+        raise NotImplementedError
+
+    def _code_scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate similarity of the query to every row, from the codes alone"""
+        raise NotImplementedError
+
+    def build(self, embeddings: np.ndarray):
+        self.vectors = normalize_embeddings(embeddings)
+        self._encode(self.vectors)
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize_embeddings(query_embedding)[0]
+        approx = self._code_scores(query)
+        if not self.rerank:
+            top_indices = top_k_indices(approx, top_k)
+            return top_indices, approx[top_indices]
+
+        # Sorted rows keep reads of a memory-mapped matrix sequential
+        candidates = np.sort(top_k_indices(approx, max(top_k, self.rerank)))
+        scores = self.vectors[candidates] @ query
+        order = top_k_indices(scores, top_k)
+        return candidates[order], scores[order]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the codes"""
+        return 0 if self.codes is None else self.codes.nbytes
+
+    def __len__(self) -> int:
+        return 0 if self.vectors is None else len(self.vectors)
+
+
+class Int8Index(QuantizedIndex):
+    """Scalar quantization: each dimension scaled to int8 (4x smaller than float32)"""
+
+    def __init__(self, rerank: int = 200, block_size: int = 8192):
+        super().__init__(rerank)
+        self.block_size = block_size
+        self.scale = None
+
+    def _encode(self, vectors: np.ndarray):
+        scale = np.abs(vectors).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+        self.scale = scale.astype(np.float32)
+        self.codes = np.empty(vectors.shape, dtype=np.int8)
+        for start in range(0, len(vectors), self.block_size):
+            block = vectors[start:start + self.block_size]
+            self.codes[start:start + self.block_size] = np.round(block / self.scale)
+
+    def _code_scores(self, query: np.ndarray) -> np.ndarray:
+        # Fold the scales into the query; blocks bound the float temporaries
+        scaled_query = query * self.scale
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), self.block_size):
+            block = self.codes[start:start + self.block_size]
+            scores[start:start + self.block_size] = block.astype(np.float32) @ scaled_query
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + (0 if self.scale is None else self.scale.nbytes)
+
+
+class BinaryIndex(QuantizedIndex):
+    """Sign-bit quantization: one bit per dimension (32x smaller), scored by Hamming distance"""
+
+    def _encode(self, vectors: np.ndarray):
+        self.dimension = vectors.shape[1]
+        self.codes = np.packbits(vectors > 0, axis=1)
+
+    def _code_scores(self, query: np.ndarray) -> np.ndarray:
+        query_bits = np.packbits(query > 0)
+        distances = POPCOUNT[np.bitwise_xor(self.codes, query_bits)].sum(axis=1, dtype=np.int32)
+        # Map Hamming distance onto a cosine-like scale: 1 (identical) .. -1 (opposite)
+        return 1.0 - 2.0 * distances.astype(np.float32) / self.dimension
+
+
+def create_index(index_type: str = "exact", **kwargs) -> VectorIndex:
+    """Create a vector index by name ("exact", "ivf", "int8" or "binary")"""
+    index_type = index_type.lower()
+    if index_type == "exact":
+        return ExactIndex()
+    if index_type == "ivf":
+        return IVFIndex(**kwargs)
+    if index_type == "int8":
+        return Int8Index(**kwargs)
+    if index_type == "binary":
+        return BinaryIndex(**kwargs)
+    raise ValueError(f"Unknown vector index type: {index_type}")
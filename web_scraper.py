@@ -1,21 +1,191 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+from typing import List, Dict, Optional, Iterator
+import hashlib
+import threading
 import time
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
+import xml.etree.ElementTree as ET
 import re
+from http_cache import HTTPCache
+from html_extractor import extract_with_lxml
+from chunker import SentenceChunker
+
+# Bump when parse_page output changes so cached pages are re-parsed
+PARSER_VERSION = 2
+
+# Query parameters that never change page content
+TRACKING_PARAMS = ('utm_', 'gclid', 'fbclid', 'mc_', '_ga')
+
+# Responses worth retrying, after a backoff and a fresh rate-limit token
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Links to documents and media are not crawled as pages
+SKIP_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.zip', '.mp4', '.xls', '.xlsx', '.doc', '.docx')
+
+# Important pages to scrape, relative to base_url
+IMPORTANT_PATHS = [
+    "/",
+    "/insurance-plans.html",
+    "/term-insurance.html",
+    "/savings-plan.html",
+    "/pension-plans.html",
+    "/ulip-plans.html",
+    "/claims/death-claim.html",
+    "/claims/maturity-claim.html",
+    "/about-us.html",
+    "/contact-us.html",
+]
+
+class TokenBucket:
+    """Thread-safe token bucket: allows `rate` requests per second with bursts up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings dedupe to one page"""
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    path = re.sub(r'/{2,}', '/', parsed.path) or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    ))
+    return urlunparse((scheme, netloc, path, '', query, ''))
+
+class SeenSet:
+    """Compact URL dedup set storing 64-bit hashes instead of URL strings"""
+    
+    def __init__(self):
+        self._hashes = set()
+    
+    @staticmethod
+    def _key(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+    
+    def add(self, url: str) -> bool:
+        """Add a URL; returns False if it was already seen"""
+        key = self._key(url)
+        if key in self._hashes:
+            return False
+        self._hashes.add(key)
+        return True
+    
+    def __contains__(self, url: str) -> bool:
+        return self._key(url) in self._hashes
+    
+    def __len__(self) -> int:
+        return len(self._hashes)
 
 class ICICIWebScraper:
-    def __init__(self, base_url: str = "https://www.iciciprulife.com", max_pages: int = 20):
-        self.base_url = base_url
+    def __init__(self, base_url: str = "https://www.iciciprulife.com", max_pages: int = 20,
+                 max_workers: int = 4, requests_per_second: float = 2.0, max_retries: int = 3,
+                 allowed_domain: str = "iciciprulife.com", cache_dir: Optional[str] = None,
+                 extractor: str = "lxml", chunker: Optional[SentenceChunker] = None):
+        if extractor not in ("lxml", "bs4"):
+            raise ValueError(f"Unknown HTML extractor: {extractor}")
+        self.base_url = base_url.rstrip('/')
         self.max_pages = max_pages
-        self.visited_urls = set()
+        self.max_workers = max(1, max_workers)
+        self.requests_per_second = requests_per_second
+        self.allowed_domain = allowed_domain
+        # Hashes only, so memory does not grow with URL length on large crawls
+        self.visited_urls = SeenSet()
         self.scraped_content = []
+        # Pages confirmed gone (404/410) or left without usable text, as opposed to
+        # pages that merely failed to fetch this time
+        self.removed_urls = set()
+        self.http_cache = HTTPCache(cache_dir) if cache_dir else None
+        self.extractor = extractor
+        self.chunker = chunker or SentenceChunker()
+        # Cached parses are only reused when both the parser version and backend match
+        self.parser_version = f"{PARSER_VERSION}:{extractor}"
+        self.not_modified = 0
+        
+        # Shared keep-alive session. The adapter only retries failed connections, which
+        # never reach the server; retries that do are made in fetch() through the rate limiter
+        self.max_retries = max_retries
+        retry = Retry(total=max_retries, connect=max_retries, read=0, status=0, other=0,
+                      backoff_factor=0.5, allowed_methods=["GET", "HEAD"])
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Per-host politeness limiters and robots.txt rules
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._robots = {}
+    
+    def _wait_for_host(self, url: str):
+        """Rate limit requests per host with a token bucket"""
+        if self.requests_per_second <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.requests_per_second)
+        bucket.acquire()
+    
+    def fetch(self, url: str, headers: Optional[Dict] = None) -> requests.Response:
+        """
+        GET a URL through the shared session, respecting the per-host rate limit.
+        429/5xx responses and read timeouts are retried with exponential backoff
+        (or the server's Retry-After), and every attempt takes its own token.
+        """
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_host(url)
+            try:
+                response = self.session.get(url, headers=headers, timeout=10)
+            except requests.exceptions.Timeout:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            time.sleep(self._retry_delay(response, attempt))
+    
+    @staticmethod
+    def _retry_delay(response: requests.Response, attempt: int) -> float:
+        """Seconds to wait before retrying: Retry-After when given in seconds, else exponential backoff"""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), 60.0)
+        return 0.5 * 2 ** attempt
         
     def is_valid_url(self, url: str) -> bool:
         """Check if URL is valid and belongs to ICICI domain"""
         parsed = urlparse(url)
-        return bool(parsed.netloc) and 'iciciprulife.com' in parsed.netloc.lower()
+        return bool(parsed.netloc) and self.allowed_domain in parsed.netloc.lower()
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
@@ -26,122 +196,273 @@ class ICICIWebScraper:
         return text.strip()
     
     def extract_text_from_page(self, url: str) -> Dict:
-        """Extract text content from a webpage"""
+        """Extract text content from a webpage, revalidating any cached copy"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            cached = self.http_cache.get(url) if self.http_cache else None
+            headers = self.http_cache.conditional_headers(cached) if cached else None
             
-            # Remove script and style elements
-            for script in soup(['script', 'style', 'nav', 'footer', 'header']):
-                script.decompose()
+            response = self.fetch(url, headers=headers)
             
-            # Get title
-            title = soup.find('title')
-            title_text = title.get_text() if title else ""
+            if response.status_code == 304 and cached:
+                # Unchanged since the last fetch: reuse the parsed page when it is current
+                self.not_modified += 1
+                if cached.get('page') and cached.get('parser_version') == self.parser_version:
+                    self.http_cache.touch(url, cached)
+                    return cached['page']
+                page = self.parse_page(url, cached['body'])
+                self.http_cache.touch(url, cached, page=page, parser_version=self.parser_version)
+                return page
             
-            # Get main content
-            # Try to find main content areas
-            main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile('content|main'))
-            
-            if main_content:
-                text = main_content.get_text(separator=' ', strip=True)
-            else:
-                text = soup.get_text(separator=' ', strip=True)
-            
-            # Clean the text
-            cleaned_text = self.clean_text(text)
+            if response.status_code in (404, 410):
+                self.removed_urls.add(url)
+            response.raise_for_status()
             
-            # Get meta description
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            description = meta_desc.get('content', '') if meta_desc else ""
-            
-            return {
-                'url': url,
-                'title': self.clean_text(title_text),
-                'description': self.clean_text(description),
-                'content': cleaned_text
-            }
+            page = self.parse_page(url, response.content)
+            if self.http_cache:
+                self.http_cache.put(url, response.content, response.headers, page=page,
+                                    parser_version=self.parser_version)
+            return page
             
         except Exception as e:
             print(f"Error scraping {url}: {e}")
             return None
     
-    def get_links_from_page(self, url: str, soup: BeautifulSoup) -> List[str]:
-        """Extract all links from a page"""
+    def parse_page(self, url: str, html: bytes) -> Dict:
+        """Parse raw HTML into title, description, main content and links"""
+        if self.extractor == "lxml":
+            extracted = extract_with_lxml(html)
+            return {
+                'url': url,
+                'title': self.clean_text(extracted['title']),
+                'description': self.clean_text(extracted['description']),
+                'content': self.clean_text(extracted['text']),
+                'links': self.resolve_links(url, extracted['hrefs'], skip_visited=False)
+            }
+        return self.parse_page_bs4(url, html)
+    
+    def parse_page_bs4(self, url: str, html: bytes) -> Dict:
+        """Parse raw HTML with BeautifulSoup (reference extraction path)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Collect links before navigation elements are removed
+        links = self.get_links_from_page(url, soup, skip_visited=False)
+        
+        # Remove script and style elements
+        for script in soup(['script', 'style', 'nav', 'footer', 'header']):
+            script.decompose()
+        
+        # Get title
+        title = soup.find('title')
+        title_text = title.get_text() if title else ""
+        
+        # Get main content
+        # Try to find main content areas
+        main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile('content|main'))
+        
+        if main_content:
+            text = main_content.get_text(separator=' ', strip=True)
+        else:
+            text = soup.get_text(separator=' ', strip=True)
+        
+        # Clean the text
+        cleaned_text = self.clean_text(text)
+        
+        # Get meta description
+        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        description = meta_desc.get('content', '') if meta_desc else ""
+        
+        return {
+            'url': url,
+            'title': self.clean_text(title_text),
+            'description': self.clean_text(description),
+            'content': cleaned_text,
+            'links': links
+        }
+    
+    def get_links_from_page(self, url: str, soup: BeautifulSoup, skip_visited: bool = True) -> List[str]:
+        """Extract all crawlable links from a page, canonicalized and deduplicated"""
+        hrefs = [link['href'] for link in soup.find_all('a', href=True)]
+        return self.resolve_links(url, hrefs, skip_visited)
+    
+    def resolve_links(self, url: str, hrefs: List[str], skip_visited: bool = True) -> List[str]:
+        """Resolve raw hrefs against a page URL, keeping crawlable same-domain links"""
         links = []
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            full_url = urljoin(url, href)
+        seen = set()
+        for href in hrefs:
+            full_url = canonicalize_url(urljoin(url, href))
             
-            if self.is_valid_url(full_url) and full_url not in self.visited_urls:
+            if not self.is_valid_url(full_url) or urlparse(full_url).path.lower().endswith(SKIP_EXTENSIONS):
+                continue
+            if skip_visited and full_url in self.visited_urls:
+                continue
+            if full_url not in seen:
+                seen.add(full_url)
                 links.append(full_url)
         
         return links
     
-    def scrape_important_pages(self) -> List[Dict]:
-        """Scrape important pages from ICICI Insurance website"""
-        # Important pages to scrape
-        important_urls = [
-            "https://www.iciciprulife.com/",
-            "https://www.iciciprulife.com/insurance-plans.html",
-            "https://www.iciciprulife.com/term-insurance.html",
-            "https://www.iciciprulife.com/savings-plan.html",
-            "https://www.iciciprulife.com/pension-plans.html",
-            "https://www.iciciprulife.com/ulip-plans.html",
-            "https://www.iciciprulife.com/claims/death-claim.html",
-            "https://www.iciciprulife.com/claims/maturity-claim.html",
-            "https://www.iciciprulife.com/about-us.html",
-            "https://www.iciciprulife.com/contact-us.html",
-        ]
-        
-        print(f"Starting web scraping from ICICI Insurance website...")
+    def _robots_for(self, url: str) -> RobotFileParser:
+        """Fetch and cache robots.txt rules for a URL's host (missing robots.txt allows all)"""
+        parsed = urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+        if host not in self._robots:
+            parser = RobotFileParser(host + "/robots.txt")
+            try:
+                response = self.fetch(host + "/robots.txt")
+                parser.parse(response.text.splitlines() if response.status_code == 200 else [])
+            except Exception as e:
+                print(f"Could not fetch robots.txt for {host}: {e}")
+                parser.parse([])
+            self._robots[host] = parser
+        return self._robots[host]
+    
+    def can_fetch(self, url: str) -> bool:
+        """Check robots.txt for our user agent"""
+        return self._robots_for(url).can_fetch(self.session.headers['User-Agent'], url)
+    
+    def sitemap_urls(self, sitemap_url: str = None, max_sitemaps: int = 20) -> List[str]:
+        """Page URLs listed in sitemap.xml (and robots.txt Sitemap entries), following sitemap indexes"""
+        pending = [sitemap_url or self.base_url + "/sitemap.xml"]
+        pending.extend(self._robots_for(self.base_url).site_maps() or [])
         
-        for url in important_urls:
-            if len(self.scraped_content) >= self.max_pages:
-                break
-            
-            if url in self.visited_urls:
+        urls = []
+        fetched = set()
+        while pending and len(fetched) < max_sitemaps:
+            current = pending.pop(0)
+            if current in fetched:
+                continue
+            fetched.add(current)
+            try:
+                response = self.fetch(current)
+                if response.status_code != 200:
+                    continue
+                root = ET.fromstring(response.content)
+            except Exception as e:
+                print(f"Could not read sitemap {current}: {e}")
                 continue
             
-            print(f"Scraping: {url}")
+            for loc in root.iter():
+                if not loc.tag.endswith('loc') or not loc.text:
+                    continue
+                location = loc.text.strip()
+                if root.tag.endswith('sitemapindex'):
+                    pending.append(location)
+                elif self.is_valid_url(location):
+                    urls.append(canonicalize_url(location))
+        return urls
+    
+    def crawl(self, seeds: List[str] = None, max_depth: int = 2, use_sitemap: bool = True) -> Iterator[Dict]:
+        """
+        Breadth-first crawl from the important pages (and sitemap.xml), following links
+        up to max_depth and at most max_pages pages. Pages are yielded as they arrive
+        and are not kept in scraped_content, so callers can chunk them incrementally.
+        """
+        if seeds is None:
+            seeds = [self.base_url + path for path in IMPORTANT_PATHS]
+        if use_sitemap:
+            seeds = list(seeds) + self.sitemap_urls()
+        
+        seen = SeenSet()
+        frontier = deque()
+        for url in seeds:
+            url = canonicalize_url(url)
+            if self.is_valid_url(url) and seen.add(url):
+                frontier.append((url, 0))
+        
+        fetched = 0
+        yielded = 0
+        in_flight = {}
+        print(f"Crawling {self.base_url} (depth {max_depth}, max {self.max_pages} pages, "
+              f"{len(frontier)} seeds)...")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while frontier or in_flight:
+                # Keep the pool busy without exceeding the page budget
+                while frontier and len(in_flight) < self.max_workers and fetched < self.max_pages:
+                    url, depth = frontier.popleft()
+                    if not self.can_fetch(url):
+                        continue
+                    self.visited_urls.add(url)
+                    in_flight[pool.submit(self.extract_text_from_page, url)] = depth
+                    fetched += 1
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = in_flight.pop(future)
+                    page_data = future.result()
+                    if not page_data:
+                        continue
+                    
+                    links = page_data.pop('links', [])
+                    if depth < max_depth:
+                        for link in links:
+                            if seen.add(link):
+                                frontier.append((link, depth + 1))
+                    
+                    if len(page_data['content']) > 100:
+                        yielded += 1
+                        yield page_data
+                    else:
+                        self.removed_urls.add(page_data['url'])
+        
+        print(f"Crawled {fetched} pages, {yielded} with content ({len(seen)} URLs discovered)")
+    
+    def scrape_important_pages(self, urls: List[str] = None) -> List[Dict]:
+        """Scrape important pages from ICICI Insurance website concurrently"""
+        if urls is None:
+            urls = [self.base_url + path for path in IMPORTANT_PATHS]
+        
+        # Dedupe while keeping order, and never fetch more than max_pages
+        pending = []
+        for url in urls:
+            if url not in self.visited_urls and url not in pending:
+                pending.append(url)
+        pending = pending[:max(0, self.max_pages - len(self.scraped_content))]
+        for url in pending:
             self.visited_urls.add(url)
-            
-            page_data = self.extract_text_from_page(url)
-            if page_data and len(page_data['content']) > 100:
-                self.scraped_content.append(page_data)
-            
-            # Be polite - wait between requests
-            time.sleep(1)
         
-        print(f"Scraped {len(self.scraped_content)} pages successfully")
+        print(f"Starting web scraping from ICICI Insurance website ({len(pending)} pages, "
+              f"{self.max_workers} workers)...")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # map keeps results in the original URL order
+            for url, page_data in zip(pending, pool.map(self.extract_text_from_page, pending)):
+                print(f"Scraped: {url}")
+                if page_data:
+                    page_data.pop('links', None)
+                if page_data and len(page_data['content']) > 100:
+                    self.scraped_content.append(page_data)
+                elif page_data:
+                    self.removed_urls.add(url)
+        
+        print(f"Scraped {len(self.scraped_content)} pages successfully "
+              f"({self.not_modified} not modified since last fetch)")
         return self.scraped_content
     
-    def create_chunks_from_web_content(self, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    def create_chunks_from_page(self, page: Dict) -> List[str]:
+        """Convert one scraped page into sentence-aware, token-budgeted chunks"""
+        # Create a context prefix for the page
+        prefix = f"From {page['title']}: "
+        reserved = self.chunker.count_tokens([prefix])[0]
+        
+        # Combine description and content
+        full_text = f"{page['description']} {page['content']}"
+        
+        return [
+            prefix + chunk
+            for _, chunk in self.chunker.iter_chunks([full_text], reserved_tokens=reserved)
+            if len(chunk) > 100  # Only add substantial chunks
+        ]
+    
+    def create_chunks_from_web_content(self) -> List[str]:
         """Convert scraped web content into chunks"""
         all_chunks = []
         
         for page in self.scraped_content:
-            # Create a context prefix for each page
-            prefix = f"From {page['title']}: "
-            
-            # Combine description and content
-            full_text = f"{page['description']} {page['content']}"
-            
-            # Split into words
-            words = full_text.split()
-            
-            # Create chunks
-            for i in range(0, len(words), chunk_size - overlap):
-                chunk_words = words[i:i + chunk_size]
-                chunk = ' '.join(chunk_words)
-                
-                if len(chunk.strip()) > 100:  # Only add substantial chunks
-                    all_chunks.append(prefix + chunk.strip())
+            all_chunks.extend(self.create_chunks_from_page(page))
         
         print(f"Created {len(all_chunks)} chunks from web content")
         return all_chunks